@@ -1,5 +1,9 @@
 # __init__.py
-import bpy
+try:
+    import bpy
+except ImportError:
+    # Imported outside of Blender by the quadric worker processes, only the bpy-free modules are loaded
+    bpy = None
 import logging
 
 if "bpy" in locals():
@@ -10,11 +14,43 @@ if "bpy" in locals():
         importlib.reload(ui)
     if "properties" in locals():
         importlib.reload(properties)
+    if "manifest" in locals():
+        importlib.reload(manifest)
+    if "handlers" in locals():
+        importlib.reload(handlers)
+    if "normal_bake" in locals():
+        importlib.reload(normal_bake)
+    if "mesh_cache" in locals():
+        importlib.reload(mesh_cache)
+    if "budget" in locals():
+        importlib.reload(budget)
+    if "mesh_cleanup" in locals():
+        importlib.reload(mesh_cleanup)
+    if "streaming" in locals():
+        importlib.reload(streaming)
+    if "occlusion" in locals():
+        importlib.reload(occlusion)
+    if "scheduler" in locals():
+        importlib.reload(scheduler)
+    if "quadric" in locals():
+        importlib.reload(quadric)
 
 
-from . import operators
-from . import ui
-from . import properties
+from . import quadric
+
+if bpy is not None:
+    from . import manifest
+    from . import handlers
+    from . import normal_bake
+    from . import mesh_cache
+    from . import budget
+    from . import mesh_cleanup
+    from . import streaming
+    from . import occlusion
+    from . import scheduler
+    from . import operators
+    from . import ui
+    from . import properties
 
 bl_info = {
     "name": "MSFS LOD Maker",
@@ -38,21 +74,19 @@ def setup_logging():
 
 def register():
     setup_logging()
-    try:
-        properties.register()
-        operators.register()
-        ui.register()
-    except Exception as e:
-        print(f"Error during registration: {str(e)}")
-        # Optionally, you can add a cleanup here if partial registration occurred
+    # Each module is registered on its own, so a failing one doesn't leave the handlers out
+    for module in (properties, operators, handlers, ui):
+        try:
+            module.register()
+        except Exception as e:
+            print(f"Error registering {module.__name__}: {str(e)}")
 
 def unregister():
-    try:
-        ui.unregister()
-        operators.unregister()
-        properties.unregister()
-    except Exception as e:
-        print(f"Error during unregistration: {str(e)}")
+    for module in (ui, handlers, operators, properties):
+        try:
+            module.unregister()
+        except Exception as e:
+            print(f"Error unregistering {module.__name__}: {str(e)}")
 
 if __name__ == "__main__":
     register()
\ No newline at end of file
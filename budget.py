@@ -0,0 +1,143 @@
+# budget.py
+#
+# Per-LOD performance budget analysis.
+# Counts triangles, vertices, draw calls, materials, texture memory and baked color attribute memory
+# for every LOD collection of every asset, reading the evaluated meshes with foreach_get, and checks the results
+# against the configured MSFS budgets.
+# The report is a plain dict (stored as JSON on the scene) so the panel and headless tooling can
+# both consume it.
+
+import json
+import numpy as np
+
+MSFS_TEXTURES = (
+    'msfs_base_color_texture',
+    'msfs_occlusion_metallic_roughness_texture',
+    'msfs_normal_texture',
+    'msfs_emissive_texture',
+)
+
+
+def texture_bytes(image):
+    width, height = image.size
+    if image.file_format == 'DDS':
+        # Block compressed (BC3/BC7), one byte per pixel
+        size = width * height
+    else:
+        size = width * height * image.channels * (4 if image.is_float else 1)
+    # Full mip chain
+    return size * 4 // 3
+
+
+def material_images(material):
+    images = set()
+    if material.use_nodes:
+        images.update(node.image for node in material.node_tree.nodes if node.type == 'TEX_IMAGE' and node.image)
+    for prop in MSFS_TEXTURES:
+        image = getattr(material, prop, None)
+        if image:
+            images.add(image)
+    return images
+
+
+def color_attribute_bytes(mesh):
+    size = 0
+    for attribute in mesh.color_attributes:
+        count = len(mesh.vertices) if attribute.domain == 'POINT' else len(mesh.loops)
+        size += count * (16 if attribute.data_type == 'FLOAT_COLOR' else 4)
+    return size
+
+
+def analyze_lod(collection, depsgraph):
+    triangles = vertices = draw_calls = objects = color_bytes = 0
+    materials = set()
+
+    for obj in collection.all_objects:
+        if obj.type != 'MESH':
+            continue
+        mesh = obj.evaluated_get(depsgraph).data
+        objects += 1
+
+        loop_total = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", loop_total)
+        triangles += int(np.maximum(loop_total - 2, 0).sum())
+        vertices += len(mesh.vertices)
+        color_bytes += color_attribute_bytes(mesh)
+
+        # One draw call per material used by the mesh
+        used_slots = [slot.material for slot in obj.material_slots]
+        if used_slots and len(mesh.polygons):
+            material_index = np.empty(len(mesh.polygons), dtype=np.int32)
+            mesh.polygons.foreach_get("material_index", material_index)
+            used = np.unique(np.clip(material_index, 0, len(used_slots) - 1))
+            draw_calls += len(used)
+            materials.update(used_slots[i] for i in used.tolist() if used_slots[i])
+        else:
+            draw_calls += 1
+
+    images = set()
+    for material in materials:
+        images.update(material_images(material))
+
+    return {
+        "name": collection.name,
+        "triangles": triangles,
+        "vertices": vertices,
+        "objects": objects,
+        "draw_calls": draw_calls,
+        "materials": len(materials),
+        "texture_bytes": sum(texture_bytes(image) for image in images),
+        "color_bytes": color_bytes,
+    }
+
+
+def budgets(scn):
+    return {
+        "triangle_ratio": scn.lod.budget_triangle_ratio,
+        "max_draw_calls": scn.lod.budget_max_draw_calls,
+        "max_texture_mb": scn.lod.budget_max_texture_mb,
+    }
+
+
+def check_budgets(lods, limits):
+    # Returns (lod index, message) for every budget violation
+    violations = []
+    for i, lod in enumerate(lods):
+        if i > 0 and lods[i - 1]["triangles"]:
+            ratio = lod["triangles"] / lods[i - 1]["triangles"]
+            if ratio > limits["triangle_ratio"]:
+                violations.append((i, f"{ratio:.0%} of the previous LOD triangles (max {limits['triangle_ratio']:.0%})"))
+        if limits["max_draw_calls"] and lod["draw_calls"] > limits["max_draw_calls"]:
+            violations.append((i, f"{lod['draw_calls']} draw calls (max {limits['max_draw_calls']})"))
+        texture_mb = lod["texture_bytes"] / (1024 * 1024)
+        if limits["max_texture_mb"] and texture_mb > limits["max_texture_mb"]:
+            violations.append((i, f"{texture_mb:.1f} MB of textures (max {limits['max_texture_mb']:.1f} MB)"))
+    return violations
+
+
+def analyze_lods(scn, depsgraph):
+    # One entry per asset, the triangle ratio is checked between the LODs of the same asset
+    limits = budgets(scn)
+    assets = []
+    violation_count = 0
+    for asset in scn.lod.assets:
+        lods = [analyze_lod(item.ui_lod, depsgraph) for item in asset.lod_list if item.ui_lod]
+        violations = check_budgets(lods, limits)
+        for i, message in violations:
+            lods[i].setdefault("violations", []).append(message)
+        violation_count += len(violations)
+        assets.append({"name": asset.name, "lods": lods})
+    return {"assets": assets, "budgets": limits, "violations": violation_count}
+
+
+def store_report(scn, report):
+    scn.lod.budget_report = json.dumps(report, separators=(',', ':'))
+
+
+def load_report(scn):
+    if not scn.lod.budget_report:
+        return None
+    try:
+        return json.loads(scn.lod.budget_report)
+    except ValueError:
+        return None
@@ -0,0 +1,309 @@
+# handlers.py
+#
+# Application handlers that make the LOD flags of LODIFY_props_list effective:
+# - ui_dsp: active LOD in the viewport (solid/material preview)
+# - ui_rdv: active LOD in the rendered viewport (when p_rdv_switch is enabled)
+# - ui_rdf: active LOD in the final render (when p_rdf_switch is enabled)
+# Viewport switching toggles the layer collection hide_viewport state, final render switching
+# excludes the inactive LOD collections and restores them once the render is done.
+# Layer collections are only written when their actual state differs from the wanted one.
+#
+# An optional live preview picks the active LOD per asset from the screen size of its
+# bounding sphere (MSFS minSize), polled from a throttled timer.
+
+import bpy
+import math
+import numpy as np
+from bpy.app.handlers import persistent
+from . import scheduler
+
+# Layer collections excluded for the final render, restored afterwards
+_render_excluded = {}
+# World space bounding sphere per base collection, as (center, radius)
+_sphere_cache = {}
+# Active LOD index per asset picked by the distance preview
+_preview_active = {}
+_last_view = {}
+_rendering = False
+# Set while an operator generates LODs, the visibility switching would hide its bake targets
+_generating = False
+
+
+def lod_assets(scn):
+    return [asset.lod_list for asset in scn.lod.assets]
+
+
+def find_layer_collections(layer_collection, result=None):
+    if result is None:
+        result = {}
+    for child in layer_collection.children:
+        result[child.collection.name] = child
+        find_layer_collections(child, result)
+    return result
+
+
+def set_generating(value):
+    global _generating
+    _generating = value
+
+
+def show_layer_collections(view_layer):
+    # Unhides every hidden layer collection, returns their names to hide them again
+    layer_collections = find_layer_collections(view_layer.layer_collection)
+    hidden = [name for name, layer_collection in layer_collections.items() if layer_collection.hide_viewport]
+    for name in hidden:
+        layer_collections[name].hide_viewport = False
+    return hidden
+
+
+def hide_layer_collections(view_layer, names):
+    layer_collections = find_layer_collections(view_layer.layer_collection)
+    for name in names:
+        layer_collection = layer_collections.get(name)
+        if layer_collection:
+            layer_collection.hide_viewport = True
+
+
+def is_rendered_view(scene):
+    wm = bpy.context.window_manager
+    if not wm:
+        return False
+    for window in wm.windows:
+        if window.scene != scene:
+            continue
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D' and area.spaces.active.shading.type == 'RENDERED':
+                return True
+    return False
+
+
+def active_flag(scn, mode):
+    if mode == 'RENDER' and scn.lod.p_rdf_switch:
+        return "ui_rdf"
+    if mode == 'RENDERED' and scn.lod.p_rdv_switch:
+        return "ui_rdv"
+    return "ui_dsp"
+
+
+def desired_visibility(scn, mode):
+    # Maps LOD collection names to their visibility; assets without an active LOD are left alone
+    flag = active_flag(scn, mode)
+    visibility = {}
+    for asset_index, lod_list in enumerate(lod_assets(scn)):
+        items = [item for item in lod_list if item.ui_lod]
+        if mode != 'RENDER' and scn.lod.preview_enabled and asset_index in _preview_active:
+            active = [i == _preview_active[asset_index] for i in range(len(items))]
+        else:
+            active = [getattr(item, flag) for item in items]
+        if not any(active):
+            continue
+        for item, is_active in zip(items, active):
+            visibility[item.ui_lod.name] = is_active
+    return visibility
+
+
+def apply_visibility(scene, view_layer, mode):
+    if not scene.lod.lod_enabled:
+        return
+
+    # Compared against the actual layer collection states, not the last applied ones: LOD collections
+    # replaced under the same name (undo-light stash, worker import) start visible
+    visibility = desired_visibility(scene, mode)
+    key = (scene.name, view_layer.name)
+
+    layer_collections = find_layer_collections(view_layer.layer_collection)
+    if mode == 'RENDER':
+        excluded = _render_excluded.setdefault(key, [])
+        for name, visible in visibility.items():
+            layer_collection = layer_collections.get(name)
+            if layer_collection and not visible and not layer_collection.exclude:
+                layer_collection.exclude = True
+                excluded.append(name)
+        return
+
+    restore_render_exclude(key, layer_collections)
+    for name, visible in visibility.items():
+        layer_collection = layer_collections.get(name)
+        if layer_collection and layer_collection.hide_viewport == visible:
+            layer_collection.hide_viewport = not visible
+
+
+def restore_render_exclude(key, layer_collections):
+    for name in _render_excluded.pop(key, ()):
+        layer_collection = layer_collections.get(name)
+        if layer_collection and layer_collection.exclude:
+            layer_collection.exclude = False
+
+
+def viewport_mode(scene):
+    return 'RENDERED' if is_rendered_view(scene) else 'VIEWPORT'
+
+
+@persistent
+def lod_depsgraph_update(scene, depsgraph):
+    if _rendering or _generating or not scene.lod.lod_enabled:
+        return
+
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Object) and (update.is_updated_transform or update.is_updated_geometry):
+            _sphere_cache.clear()
+            break
+
+    apply_visibility(scene, depsgraph.view_layer, viewport_mode(scene))
+
+
+@persistent
+def lod_render_pre(scene, *args):
+    global _rendering
+    _rendering = True
+    for view_layer in scene.view_layers:
+        apply_visibility(scene, view_layer, 'RENDER')
+
+
+@persistent
+def lod_render_post(scene, *args):
+    global _rendering
+    _rendering = False
+    for view_layer in scene.view_layers:
+        apply_visibility(scene, view_layer, viewport_mode(scene))
+
+
+@persistent
+def lod_load_post(*args):
+    _render_excluded.clear()
+    _sphere_cache.clear()
+    _preview_active.clear()
+    _last_view.clear()
+    for scene in bpy.data.scenes:
+        scheduler.migrate_legacy_list(scene)
+    update_preview_timer()
+
+
+def bounding_sphere(collection):
+    sphere = _sphere_cache.get(collection.name)
+    if sphere is None:
+        corners = [
+            np.asarray(obj.matrix_world, dtype=np.float64) @ np.c_[np.asarray(obj.bound_box, dtype=np.float64), np.ones(8)].T
+            for obj in collection.all_objects if obj.type == 'MESH'
+        ]
+        if not corners:
+            return None
+        points = np.hstack(corners)[:3].T
+        center = (points.min(axis=0) + points.max(axis=0)) * 0.5
+        radius = float(np.sqrt(((points - center) ** 2).sum(axis=1).max()))
+        sphere = _sphere_cache[collection.name] = (center, radius)
+    return sphere
+
+
+def view_eye(window, scene):
+    # Returns the eye position and the tangent of half the vertical field of view
+    for area in window.screen.areas:
+        if area.type != 'VIEW_3D':
+            continue
+        space = area.spaces.active
+        region_3d = space.region_3d
+        if region_3d.view_perspective == 'CAMERA' and scene.camera:
+            camera = scene.camera
+            return np.asarray(camera.matrix_world.translation), math.tan(camera.data.angle * 0.5)
+        eye = np.asarray(region_3d.view_matrix.inverted().translation)
+        # The viewport lens is expressed for a 72mm sensor
+        return eye, 36.0 / space.lens
+    if scene.camera:
+        return np.asarray(scene.camera.matrix_world.translation), math.tan(scene.camera.data.angle * 0.5)
+    return None, None
+
+
+def update_preview(window):
+    scene = window.scene
+    eye, tan_half_fov = view_eye(window, scene)
+    if eye is None:
+        return False
+
+    view = (tuple(np.round(eye, 3)), round(tan_half_fov, 4))
+    if _last_view.get(scene.name) == view:
+        return False
+    _last_view[scene.name] = view
+
+    assets = []
+    for asset_index, lod_list in enumerate(lod_assets(scene)):
+        items = [item for item in lod_list if item.ui_lod]
+        sphere = bounding_sphere(items[0].ui_lod) if items else None
+        if sphere:
+            assets.append((asset_index, sphere, [item.ui_min_size for item in items]))
+    if not assets:
+        return False
+
+    centers = np.array([sphere[0] for _, sphere, _ in assets])
+    radii = np.array([sphere[1] for _, sphere, _ in assets])
+    lod_count = max(len(sizes) for _, _, sizes in assets)
+    thresholds = np.full((len(assets), lod_count), -np.inf)
+    for row, (_, _, sizes) in enumerate(assets):
+        thresholds[row, :len(sizes) - 1] = sizes[:-1]
+
+    # Screen coverage of the bounding sphere in percent of the view height, as MSFS minSize
+    distances = np.maximum(np.linalg.norm(centers - eye, axis=1), 1e-6)
+    coverage = radii / (distances * tan_half_fov) * 100.0
+    active = np.argmax(coverage[:, None] >= thresholds, axis=1)
+
+    changed = False
+    for (asset_index, _, _), lod_index in zip(assets, active.tolist()):
+        if _preview_active.get(asset_index) != lod_index:
+            _preview_active[asset_index] = lod_index
+            changed = True
+    return changed
+
+
+def preview_timer():
+    wm = bpy.context.window_manager
+    interval = 0.25
+    if not wm:
+        return interval
+
+    enabled = False
+    for window in wm.windows:
+        scene = window.scene
+        if not (scene.lod.lod_enabled and scene.lod.preview_enabled):
+            continue
+        enabled = True
+        interval = scene.lod.preview_interval
+        if update_preview(window) and not _rendering:
+            apply_visibility(scene, window.view_layer, viewport_mode(scene))
+
+    if not enabled:
+        _preview_active.clear()
+        _last_view.clear()
+        return None
+    return interval
+
+
+def update_preview_timer(self=None, context=None):
+    if any(scene.lod.preview_enabled for scene in bpy.data.scenes):
+        if not bpy.app.timers.is_registered(preview_timer):
+            bpy.app.timers.register(preview_timer, first_interval=0.0)
+    else:
+        _preview_active.clear()
+        _last_view.clear()
+
+
+handlers = (
+    (bpy.app.handlers.depsgraph_update_post, lod_depsgraph_update),
+    (bpy.app.handlers.render_pre, lod_render_pre),
+    (bpy.app.handlers.render_complete, lod_render_post),
+    (bpy.app.handlers.render_cancel, lod_render_post),
+    (bpy.app.handlers.load_post, lod_load_post),
+)
+
+def register():
+    for handler_list, handler in handlers:
+        if handler not in handler_list:
+            handler_list.append(handler)
+
+def unregister():
+    for handler_list, handler in handlers:
+        if handler in handler_list:
+            handler_list.remove(handler)
+    if bpy.app.timers.is_registered(preview_timer):
+        bpy.app.timers.unregister(preview_timer)
+
+if __name__ == "__main__":
+    register()
@@ -0,0 +1,181 @@
+# manifest.py
+#
+# Rollback manifest for undo-light LOD generation.
+# Instead of relying on a global undo snapshot, an undo-light generation records:
+# - the names of the datablocks it created (found by session_uid, the regenerated LODs reuse the old names)
+# - the LOD collections it replaced (stashed, not deleted, so they can be restored)
+# - the previous assets and lod_list states
+# The manifest is stored as JSON on the scene so it survives saving the file.
+
+import bpy
+import json
+
+STASH_PREFIX = "LODIFY_STASH."
+TRACKED_DATA = ("objects", "meshes", "materials", "collections", "images")
+LOD_ITEM_FLAGS = ("ui_dsp", "ui_rdv", "ui_rdf", "ui_min_size")
+
+
+def snapshot_ids():
+    # Datablocks are told apart by session_uid, names are reused by the regenerated LODs
+    return {kind: {db.session_uid for db in getattr(bpy.data, kind)} for kind in TRACKED_DATA}
+
+
+def snapshot_assets(scn):
+    assets = []
+    for asset in scn.lod.assets:
+        items = []
+        for item in asset.lod_list:
+            entry = {flag: getattr(item, flag) for flag in LOD_ITEM_FLAGS}
+            entry["ui_lod"] = item.ui_lod.name if item.ui_lod else None
+            items.append(entry)
+        assets.append({
+            "name": asset.name,
+            "base": asset.base.name if asset.base else None,
+            "items": items,
+            "index": asset.lod_list_index,
+        })
+    return {"assets": assets, "index": scn.lod.assets_index}
+
+
+def restore_assets(scn, state):
+    scn.lod.assets.clear()
+    for asset_state in state["assets"]:
+        asset = scn.lod.assets.add()
+        asset.name = asset_state["name"]
+        if asset_state["base"]:
+            asset.base = bpy.data.collections.get(asset_state["base"])
+        for entry in asset_state["items"]:
+            item = asset.lod_list.add()
+            if entry["ui_lod"]:
+                item.ui_lod = bpy.data.collections.get(entry["ui_lod"])
+            for flag in LOD_ITEM_FLAGS:
+                if flag in entry:
+                    setattr(item, flag, entry[flag])
+        asset.lod_list_index = min(asset_state["index"], max(len(asset.lod_list) - 1, 0))
+    scn.lod.assets_index = min(state["index"], max(len(scn.lod.assets) - 1, 0))
+
+
+def find_collection_parents(collection):
+    parents = []
+    for scene in bpy.data.scenes:
+        if collection.name in scene.collection.children:
+            parents.append(("SCENE", scene.name))
+    for parent in bpy.data.collections:
+        if collection.name in parent.children:
+            parents.append(("COLLECTION", parent.name))
+    return parents
+
+
+def resolve_parent(kind, name):
+    if kind == "SCENE":
+        scene = bpy.data.scenes.get(name)
+        return scene.collection if scene else None
+    return bpy.data.collections.get(name)
+
+
+def rename_hierarchy(collection, rename):
+    # Objects are renamed too, otherwise the regenerated copies would get ".001" suffixes
+    for obj in collection.all_objects:
+        obj.name = rename(obj.name)
+    for child in collection.children_recursive:
+        child.name = rename(child.name)
+    collection.name = rename(collection.name)
+
+
+class GenerationManifest:
+    def __init__(self, scn):
+        self.scene_name = scn.name
+        self.ids_before = snapshot_ids()
+        self.assets = snapshot_assets(scn)
+        self.stashed = []
+        self.created = {}
+
+    def stash_collection(self, collection):
+        # Replace an existing LOD collection by an empty one, keeping the old one for a revert
+        original_name = collection.name
+        parents = find_collection_parents(collection)
+
+        for kind, name in parents:
+            resolve_parent(kind, name).children.unlink(collection)
+        rename_hierarchy(collection, lambda name: STASH_PREFIX + name)
+        collection.use_fake_user = True
+        self.stashed.append({"name": collection.name, "parents": parents})
+
+        replacement = bpy.data.collections.new(original_name)
+        for kind, name in parents:
+            resolve_parent(kind, name).children.link(replacement)
+        return replacement
+
+    def finish(self, scn):
+        # Names are recorded once the generation is done, when they are final
+        for kind in TRACKED_DATA:
+            self.created[kind] = sorted(
+                db.name for db in getattr(bpy.data, kind)
+                if not db.library and db.session_uid not in self.ids_before[kind]
+            )
+        scn.lod.generation_manifest = json.dumps({
+            "scene": self.scene_name,
+            "created": self.created,
+            "stashed": self.stashed,
+            "assets": self.assets,
+        }, separators=(',', ':'))
+
+
+def load_manifest(scn):
+    if not scn.lod.generation_manifest:
+        return None
+    try:
+        return json.loads(scn.lod.generation_manifest)
+    except ValueError:
+        return None
+
+
+def remove_stashed(stashed):
+    collections = []
+    objects = set()
+    for entry in stashed:
+        collection = bpy.data.collections.get(entry["name"])
+        if collection:
+            collections.append(collection)
+            collections.extend(collection.children_recursive)
+            objects.update(collection.all_objects)
+    meshes = {obj.data for obj in objects if obj.type == 'MESH' and obj.data}
+    bpy.data.batch_remove(list(objects) + collections)
+    bpy.data.batch_remove([mesh for mesh in meshes if mesh.users == 0])
+
+
+def discard_manifest(scn):
+    # The stash of the previous undo-light generation is only kept until the next generation
+    manifest = load_manifest(scn)
+    if manifest:
+        remove_stashed(manifest["stashed"])
+    scn.lod.generation_manifest = ""
+
+
+def revert_manifest(scn):
+    manifest = load_manifest(scn)
+    if not manifest:
+        return False
+
+    created = []
+    for kind, names in manifest["created"].items():
+        data = getattr(bpy.data, kind)
+        created.extend(db for db in (data.get(name) for name in names) if db)
+    bpy.data.batch_remove(created)
+
+    for entry in manifest["stashed"]:
+        collection = bpy.data.collections.get(entry["name"])
+        if not collection:
+            continue
+        rename_hierarchy(collection, lambda name: name[len(STASH_PREFIX):] if name.startswith(STASH_PREFIX) else name)
+        collection.use_fake_user = False
+        for kind, name in entry["parents"]:
+            parent = resolve_parent(kind, name)
+            if parent and collection.name not in parent.children:
+                parent.children.link(collection)
+
+    # Manifests recorded before the multi-asset lists have no assets state
+    if "assets" in manifest:
+        restore_assets(scn, manifest["assets"])
+    scn.lod.generation_manifest = ""
+    return True
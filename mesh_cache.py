@@ -0,0 +1,230 @@
+# mesh_cache.py
+#
+# Persistent, content-addressed cache of generated LOD meshes, shared across sessions and .blend files.
+# Entries are keyed by a hash of the source mesh arrays plus the generation parameters, and store
+# the resulting vertex/loop/polygon/UV/color arrays as plain .npy files so they can be memory-mapped.
+# Cache hits are rebuilt with foreach_set, without evaluating any modifier.
+# The cache is capped in size, least recently used entries are evicted first.
+
+import bpy
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import numpy as np
+
+CACHE_VERSION = 1
+META_FILE = "meta.json"
+
+
+def cache_directory(scn):
+    if scn.lod.cache_path:
+        return bpy.path.abspath(scn.lod.cache_path)
+    return os.path.join(tempfile.gettempdir(), "lodify_mesh_cache")
+
+
+def entry_directory(directory, key):
+    return os.path.join(directory, key[:2], key)
+
+
+def domain_size(mesh, domain):
+    return len(mesh.vertices) if domain == 'POINT' else len(mesh.loops)
+
+
+def read_mesh_arrays(mesh):
+    arrays = {}
+    meta = {"uv": [], "colors": []}
+
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    arrays["co"] = co.reshape(-1, 3)
+
+    loop_vert = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert)
+    arrays["loop_vert"] = loop_vert
+
+    for prop, dtype in (("loop_start", np.int32), ("loop_total", np.int32), ("material_index", np.int32), ("use_smooth", bool)):
+        values = np.empty(len(mesh.polygons), dtype=dtype)
+        mesh.polygons.foreach_get(prop, values)
+        arrays[prop] = values
+
+    for i, uv_layer in enumerate(mesh.uv_layers):
+        uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", uv)
+        arrays[f"uv_{i}"] = uv.reshape(-1, 2)
+        meta["uv"].append(uv_layer.name)
+
+    for i, attribute in enumerate(mesh.color_attributes):
+        color = np.empty(domain_size(mesh, attribute.domain) * 4, dtype=np.float32)
+        attribute.data.foreach_get("color", color)
+        arrays[f"color_{i}"] = color.reshape(-1, 4)
+        meta["colors"].append({"name": attribute.name, "type": attribute.data_type, "domain": attribute.domain})
+
+    return arrays, meta
+
+
+def mesh_key(mesh, params):
+    hasher = hashlib.blake2b(digest_size=20)
+    arrays, meta = read_mesh_arrays(mesh)
+    for name in sorted(arrays):
+        hasher.update(name.encode())
+        hasher.update(np.ascontiguousarray(arrays[name]).tobytes())
+    hasher.update(json.dumps(meta, sort_keys=True).encode())
+    hasher.update(repr((CACHE_VERSION, params)).encode())
+    return hasher.hexdigest()
+
+
+def image_signature(hasher, image):
+    hasher.update(repr((image.name, tuple(image.size), image.source, image.colorspace_settings.name)).encode())
+    if image.packed_file:
+        hasher.update(image.packed_file.data)
+    elif image.source == 'FILE' and image.filepath and not image.is_dirty:
+        # The file is read again for the bake, its size and modification time stand for its content
+        try:
+            stat = os.stat(bpy.path.abspath(image.filepath, library=image.library))
+            hasher.update(repr((image.filepath, stat.st_size, stat.st_mtime_ns)).encode())
+        except OSError:
+            hasher.update(image.filepath.encode())
+    elif image.has_data:
+        # Generated or edited in Blender
+        pixels = np.empty(len(image.pixels), dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        hasher.update(pixels.tobytes())
+
+
+def node_values(node):
+    # Unlinked input values and the node settings (blend modes, interpolation...)
+    values = [node.bl_idname, node.name]
+    for socket in node.inputs:
+        value = getattr(socket, "default_value", None)
+        values.append((socket.identifier, socket.is_linked, tuple(value) if hasattr(value, "__len__") and not isinstance(value, str) else value))
+    for prop in node.bl_rna.properties:
+        if not prop.is_readonly and prop.type in {'BOOLEAN', 'INT', 'FLOAT', 'ENUM', 'STRING'} and prop.identifier != "name":
+            value = getattr(node, prop.identifier)
+            values.append((prop.identifier, tuple(value) if hasattr(value, "__len__") and not isinstance(value, str) else value))
+    return values
+
+
+def material_signature(mesh):
+    # Baked vertex colors depend on the materials, their node values and their image contents,
+    # not only on the mesh
+    hasher = hashlib.blake2b(digest_size=16)
+    images = set()
+    for material in mesh.materials:
+        if not material:
+            hasher.update(b"None")
+            continue
+        hasher.update(material.name.encode())
+        if not material.use_nodes:
+            hasher.update(repr(tuple(material.diffuse_color)).encode())
+            continue
+        for node in material.node_tree.nodes:
+            hasher.update(repr(node_values(node)).encode())
+            if node.type == 'TEX_IMAGE' and node.image:
+                images.add(node.image)
+        for link in material.node_tree.links:
+            hasher.update(repr((link.from_node.name, link.from_socket.identifier,
+                                link.to_node.name, link.to_socket.identifier)).encode())
+    for image in sorted(images, key=lambda image: image.name):
+        image_signature(hasher, image)
+    return hasher.hexdigest()
+
+
+def load(directory, key):
+    path = entry_directory(directory, key)
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.isfile(meta_path):
+        return None
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in meta["arrays"]}
+        # Touch the entry for the LRU eviction
+        os.utime(meta_path)
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning(f"Discarding unreadable mesh cache entry {key}: {e}")
+        shutil.rmtree(path, ignore_errors=True)
+        return None
+    return arrays, meta
+
+
+def store(directory, key, arrays, meta):
+    path = entry_directory(directory, key)
+    if os.path.isdir(path):
+        return
+    # Write to a temporary directory first so a concurrent reader never sees a partial entry
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(temp_path, exist_ok=True)
+        for name, values in arrays.items():
+            np.save(os.path.join(temp_path, f"{name}.npy"), values)
+        with open(os.path.join(temp_path, META_FILE), "w") as f:
+            json.dump(dict(meta, arrays=sorted(arrays)), f)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logging.warning(f"Could not store mesh cache entry {key}: {e}")
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+
+def build_mesh(name, arrays, meta):
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(arrays["co"]))
+    mesh.vertices.foreach_set("co", np.ascontiguousarray(arrays["co"]).ravel())
+    mesh.loops.add(len(arrays["loop_vert"]))
+    mesh.loops.foreach_set("vertex_index", np.ascontiguousarray(arrays["loop_vert"]))
+    mesh.polygons.add(len(arrays["loop_start"]))
+    mesh.polygons.foreach_set("loop_start", np.ascontiguousarray(arrays["loop_start"]))
+    try:
+        mesh.polygons.foreach_set("loop_total", np.ascontiguousarray(arrays["loop_total"]))
+    except (AttributeError, TypeError, RuntimeError):
+        pass  # Read-only and derived from loop_start since Blender 4.0
+    mesh.polygons.foreach_set("material_index", np.ascontiguousarray(arrays["material_index"]))
+    mesh.polygons.foreach_set("use_smooth", np.ascontiguousarray(arrays["use_smooth"]))
+
+    for i, uv_name in enumerate(meta["uv"]):
+        uv_layer = mesh.uv_layers.new(name=uv_name, do_init=False)
+        uv_layer.data.foreach_set("uv", np.ascontiguousarray(arrays[f"uv_{i}"]).ravel())
+
+    for i, color in enumerate(meta["colors"]):
+        attribute = mesh.color_attributes.new(name=color["name"], type=color["type"], domain=color["domain"])
+        attribute.data.foreach_set("color", np.ascontiguousarray(arrays[f"color_{i}"]).ravel())
+    if meta["colors"]:
+        mesh.color_attributes.active_color = mesh.color_attributes[meta["colors"][0]["name"]]
+
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+def entry_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def evict(directory, max_bytes):
+    # Removes least recently used entries until the cache fits in max_bytes
+    entries = []
+    if not os.path.isdir(directory):
+        return 0
+    for prefix in os.scandir(directory):
+        if not prefix.is_dir():
+            continue
+        for entry in os.scandir(prefix.path):
+            meta_path = os.path.join(entry.path, META_FILE)
+            if entry.is_dir() and os.path.isfile(meta_path):
+                entries.append((os.path.getmtime(meta_path), entry_size(entry.path), entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear(directory):
+    if os.path.isdir(directory):
+        shutil.rmtree(directory, ignore_errors=True)
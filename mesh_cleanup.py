@@ -0,0 +1,141 @@
+# mesh_cleanup.py
+#
+# One-time cleanup pre-pass for LOD00 meshes, run on a working copy shared by every LOD level:
+# - merge by distance, with candidate duplicates found through a NumPy spatial hash
+# - dissolve degenerate geometry and delete zero-area faces
+# - delete loose vertices and edges
+# Clean input lets the planar dissolve of the Decimate modifier reduce much further.
+
+import bmesh
+import numpy as np
+
+
+# Neighbour cell offsets searched for duplicates, the cell itself included
+NEIGHBOUR_CELLS = np.array([(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)], dtype=np.int64)
+
+
+def cell_keys(cells):
+    # Spatial hash of integer cell coordinates, collisions only add candidates that fail the distance test
+    return (cells[:, 0] * 73856093) ^ (cells[:, 1] * 19349663) ^ (cells[:, 2] * 83492791)
+
+
+def close_pairs(co, distance):
+    # All (i, j) pairs, both ways, of distinct vertices at most distance apart. Vertices are hashed into
+    # cells of the merge distance, candidates come from the 27 cells around each vertex.
+    cells = np.floor(co / distance).astype(np.int64)
+    keys = cell_keys(cells)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    pairs = []
+    for offset in NEIGHBOUR_CELLS:
+        neighbour_keys = cell_keys(cells + offset)
+        start = np.searchsorted(sorted_keys, neighbour_keys, side='left')
+        count = np.searchsorted(sorted_keys, neighbour_keys, side='right') - start
+        if not count.any():
+            continue
+        sources = np.repeat(np.arange(len(co)), count)
+        position = np.arange(len(sources)) - np.repeat(np.cumsum(count) - count, count)
+        targets = order[np.repeat(start, count) + position]
+        close = (sources != targets) & (((co[sources] - co[targets]) ** 2).sum(axis=1) <= distance * distance)
+        pairs.append(np.stack((sources[close], targets[close]), axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    # Hash collisions between neighbour cells can report the same pair twice
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def duplicate_pairs(mesh, distance):
+    # Returns (source, target) pairs, every source is merged into a target at most distance away.
+    # Targets are the vertices without a closer-indexed duplicate, so chains never drift further.
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", co)
+    pairs = close_pairs(co.reshape(-1, 3), distance)
+    if not len(pairs):
+        return pairs
+    i, j = pairs[:, 0], pairs[:, 1]
+    root = np.ones(len(mesh.vertices), dtype=bool)
+    root[i[j < i]] = False
+
+    merge = ~root[i] & root[j]
+    target = np.full(len(mesh.vertices), len(mesh.vertices), dtype=np.int64)
+    np.minimum.at(target, i[merge], j[merge])
+    sources = np.flatnonzero(target < len(mesh.vertices))
+    return np.stack((sources, target[sources]), axis=1)
+
+
+def weld_duplicates(mesh, distance):
+    # A second pass catches the vertices whose only duplicates were merged away by the first one
+    welded = 0
+    for _ in range(2):
+        pairs = duplicate_pairs(mesh, distance)
+        if not len(pairs):
+            break
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        bm.verts.ensure_lookup_table()
+        bmesh.ops.weld_verts(bm, targetmap={bm.verts[i]: bm.verts[j] for i, j in pairs.tolist()})
+        bm.to_mesh(mesh)
+        bm.free()
+        welded += len(pairs)
+    return welded
+
+
+def dissolve_degenerate(mesh, distance):
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    bmesh.ops.dissolve_degenerate(bm, dist=distance, edges=bm.edges[:])
+    bm.to_mesh(mesh)
+    bm.free()
+
+
+def find_waste(mesh, area_epsilon):
+    # Returns the indices of the zero-area faces, of the edges left loose without them and of the
+    # vertices that aren't used by any edge. Vertices of the loose edges go away with the edges.
+    area = np.empty(len(mesh.polygons), dtype=np.float32)
+    mesh.polygons.foreach_get("area", area)
+    zero_area = area <= area_epsilon
+
+    loop_total = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    loop_edge = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("edge_index", loop_edge)
+    kept_loops = np.repeat(~zero_area, loop_total)
+    edge_used = np.bincount(loop_edge[kept_loops], minlength=len(mesh.edges)) > 0
+
+    edge_verts = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_verts)
+    vert_used = np.bincount(edge_verts, minlength=len(mesh.vertices)) > 0
+
+    return np.flatnonzero(zero_area), np.flatnonzero(~edge_used), np.flatnonzero(~vert_used)
+
+
+def delete_waste(mesh, faces, edges, verts):
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    bm.faces.ensure_lookup_table()
+    bm.edges.ensure_lookup_table()
+    bm.verts.ensure_lookup_table()
+    face_list = [bm.faces[i] for i in faces.tolist()]
+    edge_list = [bm.edges[i] for i in edges.tolist()]
+    vert_list = [bm.verts[i] for i in verts.tolist()]
+    if face_list:
+        bmesh.ops.delete(bm, geom=face_list, context='FACES_ONLY')
+    if edge_list:
+        # Also deletes the vertices left isolated
+        bmesh.ops.delete(bm, geom=edge_list, context='EDGES')
+    if vert_list:
+        bmesh.ops.delete(bm, geom=vert_list, context='VERTS')
+    bm.to_mesh(mesh)
+    bm.free()
+
+
+def clean_mesh(mesh, merge_distance):
+    # Cleans the mesh in place, returns the counts of welded vertices and deleted faces, edges and vertices
+    welded = weld_duplicates(mesh, merge_distance) if merge_distance > 0 else 0
+    dissolve_degenerate(mesh, merge_distance)
+    faces, edges, verts = find_waste(mesh, merge_distance * merge_distance)
+    if len(faces) or len(edges) or len(verts):
+        delete_waste(mesh, faces, edges, verts)
+    mesh.update()
+    return welded, len(faces), len(edges), len(verts)
@@ -0,0 +1,265 @@
+# normal_bake.py
+#
+# High-to-low normal map baking for generated LODs.
+# The normals of each LOD00 object are projected onto its LODn counterpart with a CPU Cycles
+# "selected to active" bake and written to a tangent-space normal map, which is then wired into
+# the LOD material through msfs_normal_texture.
+# Materials stay shared: every source material gets one copy and one normal map per LOD level, and
+# all the objects of the level using it bake into the same image, like they share its other
+# textures. Objects sharing a material must not overlap in UV space.
+# Only LODs that keep their materials get normal maps. LOD02 and LOD03 are baked to vertex colors
+# and have no material (nor draw call) left to carry one.
+# All pairs are baked in one session (render settings are set up and restored once), and images
+# whose pairs' evaluated meshes and bake settings did not change are kept.
+
+import bpy
+import os
+import re
+import hashlib
+import logging
+import numpy as np
+from . import handlers
+
+HASH_PROPERTY = "lodify_bake_hash"
+# Name of the source material of a normal-mapped LOD material copy, and its LOD level
+SOURCE_PROPERTY = "lodify_normal_source"
+LEVEL_PROPERTY = "lodify_normal_level"
+LOD_SUFFIX = re.compile(r"_LOD(\d+)$")
+# Flat tangent space normal
+NEUTRAL_NORMAL = (0.5, 0.5, 1.0, 1.0)
+
+
+def hash_mesh(hasher, obj, depsgraph):
+    obj_eval = obj.evaluated_get(depsgraph)
+    mesh = obj_eval.to_mesh()
+    try:
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        loops = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", loops)
+        hasher.update(co.tobytes())
+        hasher.update(loops.tobytes())
+        if mesh.uv_layers.active:
+            uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+            mesh.uv_layers.active.data.foreach_get("uv", uv)
+            hasher.update(uv.tobytes())
+    finally:
+        obj_eval.to_mesh_clear()
+    hasher.update(np.asarray(obj.matrix_world, dtype=np.float32).tobytes())
+
+
+def pair_hash(source, target, depsgraph, settings):
+    hasher = hashlib.blake2b(digest_size=16)
+    hash_mesh(hasher, source, depsgraph)
+    hash_mesh(hasher, target, depsgraph)
+    hasher.update(repr(sorted(settings.items())).encode())
+    return hasher.hexdigest()
+
+
+def lod_level(target):
+    match = LOD_SUFFIX.search(target.name)
+    return int(match.group(1)) if match else 0
+
+
+def find_shared_materials():
+    # (source material name, LOD level) -> normal-mapped copy made by a previous bake
+    return {(material[SOURCE_PROPERTY], material.get(LEVEL_PROPERTY, 0)): material
+            for material in bpy.data.materials if material.get(SOURCE_PROPERTY)}
+
+
+def lod_materials(target, level, shared):
+    # Swaps the materials of the LOD object for the copies shared by every object of its LOD level
+    materials = []
+    for slot in target.material_slots:
+        material = slot.material
+        if not material:
+            continue
+        if not material.get(SOURCE_PROPERTY):
+            key = (material.name, level)
+            if key not in shared:
+                copy = material.copy()
+                copy.name = f"{material.name}_LOD{level:02d}"
+                copy[SOURCE_PROPERTY] = material.name
+                copy[LEVEL_PROPERTY] = level
+                shared[key] = copy
+            material = slot.material = shared[key]
+        if material not in materials:
+            materials.append(material)
+    return materials
+
+
+def normal_image(material, size):
+    image_name = f"{material.name}_normal"
+    image = bpy.data.images.get(image_name)
+    if image and tuple(image.size) != (size, size):
+        image.scale(size, size)
+    if not image:
+        image = bpy.data.images.new(image_name, width=size, height=size, alpha=False)
+    image.colorspace_settings.name = 'Non-Color'
+    return image
+
+
+def clear_image(image):
+    width, height = image.size
+    image.pixels.foreach_set(np.tile(np.array(NEUTRAL_NORMAL, dtype=np.float32), width * height))
+
+
+def save_image(image, texture_path):
+    if texture_path:
+        directory = bpy.path.abspath(texture_path)
+        os.makedirs(directory, exist_ok=True)
+        image.filepath_raw = os.path.join(directory, f"{image.name}.png")
+        image.file_format = 'PNG'
+        image.save()
+    else:
+        image.pack()
+
+
+def bake_pair(source, target, images, materials, settings):
+    # images maps material names to their normal map, each material's faces bake into its own image
+    bake_nodes = []
+    for material in materials:
+        material.use_nodes = True
+        node = material.node_tree.nodes.new('ShaderNodeTexImage')
+        node.image = images[material.name]
+        material.node_tree.nodes.active = node
+        bake_nodes.append((material, node))
+
+    bpy.ops.object.select_all(action='DESELECT')
+    source.select_set(True)
+    target.select_set(True)
+    bpy.context.view_layer.objects.active = target
+    try:
+        bpy.ops.object.bake(
+            type='NORMAL',
+            normal_space='TANGENT',
+            use_selected_to_active=True,
+            cage_extrusion=settings["cage_extrusion"],
+            max_ray_distance=settings["max_ray_distance"],
+            margin=settings["margin"],
+            target='IMAGE_TEXTURES',
+            # Other objects of the LOD level already baked into the shared images
+            use_clear=False,
+        )
+    finally:
+        for material, node in bake_nodes:
+            material.node_tree.nodes.remove(node)
+
+
+def bake_normal_maps(context, pairs, scn):
+    # Returns the number of baked and skipped (unchanged) normal maps
+    settings = {
+        "size": int(scn.lod.bake_normal_size),
+        "cage_extrusion": scn.lod.bake_cage_extrusion,
+        "max_ray_distance": scn.lod.bake_max_ray_distance,
+        "margin": 4,
+    }
+
+    # Pairs that can carry a normal map, with their shared LOD materials
+    jobs = []
+    shared = find_shared_materials()
+    for source, target in pairs:
+        # LODs baked to vertex colors have no material to carry a normal map
+        if not any(slot.material for slot in target.material_slots):
+            continue
+        if not target.data.uv_layers:
+            logging.warning(f"Skipping normal bake for {target.name}: no UV map")
+            continue
+        jobs.append((source, target, lod_materials(target, lod_level(target), shared)))
+
+    render = scn.render
+    saved_render = (render.engine, scn.cycles.device, scn.cycles.samples)
+    saved_selection = [obj for obj in context.view_layer.objects if obj.select_get()]
+    saved_active = context.view_layer.objects.active
+
+    # LOD collections may be hidden by the LOD switching handlers, bake needs them visible
+    layer_collections = handlers.find_layer_collections(context.view_layer.layer_collection)
+    hidden = [lc for lc in layer_collections.values() if lc.hide_viewport]
+    for layer_collection in hidden:
+        layer_collection.hide_viewport = False
+
+    render.engine = 'CYCLES'
+    scn.cycles.device = 'CPU'
+    scn.cycles.samples = 1
+
+    baked = skipped = 0
+    depsgraph = context.evaluated_depsgraph_get()
+    try:
+        # Every image is hashed over all the pairs baked into it
+        hashers = {}
+        for source, target, materials in jobs:
+            digest = pair_hash(source, target, depsgraph, settings).encode()
+            for material in materials:
+                hashers.setdefault(material.name, hashlib.blake2b(digest_size=16)).update(digest)
+        digests = {name: hasher.hexdigest() for name, hasher in hashers.items()}
+
+        dirty = set()
+        for name, digest in digests.items():
+            image = bpy.data.images.get(f"{name}_normal")
+            if not image or image.get(HASH_PROPERTY) != digest:
+                dirty.add(name)
+        # Rebaking an object writes into all of its materials' images, those have to be rebaked whole too
+        changed = True
+        while changed:
+            changed = False
+            for source, target, materials in jobs:
+                names = {material.name for material in materials}
+                if names & dirty and not names <= dirty:
+                    dirty |= names
+                    changed = True
+
+        images = {}
+        for name in digests:
+            if name in dirty:
+                images[name] = normal_image(bpy.data.materials[name], settings["size"])
+                clear_image(images[name])
+            else:
+                images[name] = bpy.data.images[f"{name}_normal"]
+
+        failed = set()
+        for source, target, materials in jobs:
+            if not any(material.name in dirty for material in materials):
+                continue
+            try:
+                bake_pair(source, target, images, materials, settings)
+            except RuntimeError as e:
+                logging.warning(f"Normal bake failed for {target.name}: {e}")
+                failed.update(material.name for material in materials)
+
+        for name, image in images.items():
+            if name not in dirty:
+                skipped += 1
+            elif name not in failed:
+                image[HASH_PROPERTY] = digests[name]
+                save_image(image, scn.lod.texture_path)
+                baked += 1
+            material = bpy.data.materials[name]
+            if hasattr(material, 'msfs_normal_texture'):
+                material.msfs_normal_texture = image
+    finally:
+        render.engine, scn.cycles.device, scn.cycles.samples = saved_render
+        for layer_collection in hidden:
+            layer_collection.hide_viewport = True
+        bpy.ops.object.select_all(action='DESELECT')
+        for obj in saved_selection:
+            obj.select_set(True)
+        context.view_layer.objects.active = saved_active
+
+    return baked, skipped
+
+
+def find_lod_pairs(scn):
+    # Matches the objects of every generated LOD of every asset with their LOD00 source by name.
+    # LODs without materials are skipped by bake_normal_maps.
+    pairs = []
+    for asset in scn.lod.assets:
+        for lod_level, item in enumerate(asset.lod_list):
+            if lod_level == 0 or not item.ui_lod:
+                continue
+            suffix = f"_LOD{lod_level:02d}"
+            for target in item.ui_lod.all_objects:
+                if target.type == 'MESH' and target.name.endswith(suffix):
+                    source = bpy.data.objects.get(target.name[:-len(suffix)])
+                    if source and source.type == 'MESH':
+                        pairs.append((source, target))
+    return pairs
@@ -0,0 +1,149 @@
+# occlusion.py
+#
+# Ray-cast hidden geometry removal for far LODs.
+# All meshes of an asset are gathered into one BVH tree in world space, then rays are cast inwards
+# from a sphere of sample directions around the asset's bounding sphere (a grid of parallel rays per
+# direction). Faces that are never hit are checked once more with rays cast from the face itself over
+# its front hemisphere, so small exterior details missed by the grid are kept.
+# Faces that stay hidden are deleted from the LOD copies before decimation.
+# Directions and grids are fixed, so the result is deterministic.
+# BVHTree casts one ray per Python call (~3us), so the number of rays is what costs: the defaults cast
+# ~50k grid rays, and the hemisphere check is limited to a few directions and RESCUE_MAX_CASTS rays.
+
+import math
+import bmesh
+import logging
+import numpy as np
+from mathutils import Vector
+from mathutils.bvhtree import BVHTree
+
+# Directions on the whole sphere for the hemisphere check, about half of them face each face
+RESCUE_DIRECTIONS = 16
+# Most rays cast by the hemisphere check, the faces left over are kept
+RESCUE_MAX_CASTS = 1000000
+
+
+def fibonacci_directions(count):
+    # Evenly distributed unit vectors on the sphere
+    i = np.arange(count, dtype=np.float64) + 0.5
+    z = 1.0 - 2.0 * i / count
+    radius = np.sqrt(1.0 - z * z)
+    theta = math.pi * (1.0 + math.sqrt(5.0)) * i
+    return np.stack((radius * np.cos(theta), radius * np.sin(theta), z), axis=1)
+
+
+def mesh_arrays(mesh):
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", co)
+    loop_vert = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert)
+    loop_start = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    center = np.empty(len(mesh.polygons) * 3, dtype=np.float64)
+    mesh.polygons.foreach_get("center", center)
+    normal = np.empty(len(mesh.polygons) * 3, dtype=np.float64)
+    mesh.polygons.foreach_get("normal", normal)
+    return co.reshape(-1, 3), loop_vert, loop_start, center.reshape(-1, 3), normal.reshape(-1, 3)
+
+
+def world_geometry(objects, meshes):
+    # Returns the world space vertices, polygons, face centers and normals of all objects,
+    # and the offset of every object in the combined polygon list
+    verts, polygons, centers, normals, offsets = [], [], [], [], [0]
+    vert_offset = 0
+    for obj, mesh in zip(objects, meshes):
+        co, loop_vert, loop_start, center, normal = mesh_arrays(mesh)
+        matrix = np.asarray(obj.matrix_world, dtype=np.float64)
+        normal_matrix = np.linalg.inv(matrix[:3, :3]).T
+        verts.append(co @ matrix[:3, :3].T + matrix[:3, 3])
+        centers.append(center @ matrix[:3, :3].T + matrix[:3, 3])
+        world_normal = normal @ normal_matrix.T
+        normals.append(world_normal / np.maximum(np.linalg.norm(world_normal, axis=1, keepdims=True), 1e-12))
+        if len(loop_start):
+            polygons.extend((poly + vert_offset).tolist() for poly in np.split(loop_vert, loop_start[1:]))
+        vert_offset += len(co)
+        offsets.append(offsets[-1] + len(loop_start))
+
+    return (np.concatenate(verts) if verts else np.empty((0, 3)), polygons,
+            np.concatenate(centers) if centers else np.empty((0, 3)),
+            np.concatenate(normals) if normals else np.empty((0, 3)), np.array(offsets))
+
+
+def grid_hits(bvh, center, radius, directions, resolution):
+    # Casts a grid of parallel rays towards the center for every direction, returns the hit face indices
+    hit = set()
+    steps = np.linspace(-radius, radius, resolution)
+    grid_x, grid_y = np.meshgrid(steps, steps)
+    inside = grid_x ** 2 + grid_y ** 2 <= radius * radius
+    grid_x, grid_y = grid_x[inside], grid_y[inside]
+    distance = radius * 2.2
+
+    for direction in directions:
+        # Orthonormal basis of the plane the rays start from
+        helper = np.array((1.0, 0.0, 0.0)) if abs(direction[0]) < 0.9 else np.array((0.0, 1.0, 0.0))
+        u = np.cross(direction, helper)
+        u /= np.linalg.norm(u)
+        v = np.cross(direction, u)
+        origins = center + direction * radius * 1.1 + np.outer(grid_x, u) + np.outer(grid_y, v)
+        ray = Vector(-direction)
+        for origin in origins.tolist():
+            index = bvh.ray_cast(Vector(origin), ray, distance)[2]
+            if index is not None:
+                hit.add(index)
+    return hit
+
+
+def escapes(bvh, origin, rays, distance):
+    # True if one of the rays from the front side of the face reaches outside of the asset
+    for ray in rays:
+        if bvh.ray_cast(origin, ray, distance)[2] is None:
+            return True
+    return False
+
+
+def find_hidden_faces(objects, meshes, samples, resolution):
+    # Returns {object name: indices of the faces never visible from outside of the asset}
+    verts, polygons, centers, normals, offsets = world_geometry(objects, meshes)
+    if not polygons:
+        return {}
+
+    center = (verts.min(axis=0) + verts.max(axis=0)) * 0.5
+    radius = float(np.sqrt(((verts - center) ** 2).sum(axis=1).max())) or 1.0
+    bvh = BVHTree.FromPolygons(verts.tolist(), polygons, all_triangles=False)
+    directions = fibonacci_directions(samples)
+
+    visible = np.zeros(len(polygons), dtype=bool)
+    visible[list(grid_hits(bvh, center, radius, directions, resolution))] = True
+
+    epsilon = radius * 1e-4
+    rescue_directions = fibonacci_directions(RESCUE_DIRECTIONS)
+    candidates = np.flatnonzero(~visible)
+    max_faces = RESCUE_MAX_CASTS // (RESCUE_DIRECTIONS // 2)
+    if len(candidates) > max_faces:
+        logging.warning(f"Hidden geometry check limited to {max_faces} of {len(candidates)} faces, the others are kept")
+        visible[candidates[max_faces:]] = True
+    candidates = candidates[:max_faces]
+    rays = [Vector(direction) for direction in rescue_directions.tolist()]
+    # Directions on the front side of every face and ray origins, computed for all faces at once
+    facing = (normals[candidates] @ rescue_directions.T > 0.0).tolist()
+    origins = (centers[candidates] + normals[candidates] * epsilon).tolist()
+    for index, origin, front in zip(candidates.tolist(), origins, facing):
+        if escapes(bvh, Vector(origin), [ray for ray, is_front in zip(rays, front) if is_front], radius * 2.2):
+            visible[index] = True
+
+    hidden = {}
+    for i, obj in enumerate(objects):
+        faces = np.flatnonzero(~visible[offsets[i]:offsets[i + 1]])
+        if len(faces):
+            hidden[obj.name] = faces
+    return hidden
+
+
+def delete_faces(mesh, faces):
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    bm.faces.ensure_lookup_table()
+    bmesh.ops.delete(bm, geom=[bm.faces[i] for i in faces.tolist()], context='FACES')
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.update()
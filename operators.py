@@ -11,16 +11,35 @@ import bpy
 from bpy.types import Operator
 from bpy.props import IntProperty
 import os
+import time
 import bmesh
+import json
+import shutil
+import hashlib
 import logging
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from mathutils import Vector
+from . import manifest
+from . import handlers
+from . import normal_bake
+from . import mesh_cache
+from . import budget
+from . import mesh_cleanup
+from . import streaming
+from . import occlusion
+from . import scheduler
+from . import quadric
 
 def find_base_collection():
-    for scene in bpy.data.scenes:
-        for collection in scene.collection.children:
-            if collection.name.endswith("_LOD00"):
-                return collection
-    return None
+    base_collections = scheduler.find_base_collections()
+    return base_collections[0] if base_collections else None
+
+def set_status_text(context, text):
+    # Background workers have no workspace to show it in
+    if context.workspace and not bpy.app.background:
+        context.workspace.status_text_set(text)
 
 
 class LODIFY_OT_list_actions(bpy.types.Operator):
@@ -36,16 +55,20 @@ class LODIFY_OT_list_actions(bpy.types.Operator):
     )
 
     def execute(self, context):
-        scn = context.scene
-        idx = scn.lod.lod_list_index
+        asset = context.scene.lod.active_asset()
+        if asset is None:
+            self.report({'WARNING'}, "No asset selected")
+            return {'CANCELLED'}
+        idx = asset.lod_list_index
 
         if self.action == 'ADD':
-            item = scn.lod.lod_list.add()
-            item.name = f"LOD{len(scn.lod.lod_list) - 1:02d}"
-            scn.lod.lod_list_index = len(scn.lod.lod_list) - 1
+            item = asset.lod_list.add()
+            item.name = f"LOD{len(asset.lod_list) - 1:02d}"
+            item.ui_min_size = scheduler.LOD_MIN_SIZES[min(len(asset.lod_list) - 1, len(scheduler.LOD_MIN_SIZES) - 1)]
+            asset.lod_list_index = len(asset.lod_list) - 1
         elif self.action == 'REMOVE':
-            scn.lod.lod_list.remove(idx)
-            scn.lod.lod_list_index = min(max(0, idx - 1), len(scn.lod.lod_list) - 1)
+            asset.lod_list.remove(idx)
+            asset.lod_list_index = min(max(0, idx - 1), len(asset.lod_list) - 1)
 
         return {'FINISHED'}
 
@@ -55,61 +78,120 @@ class LODIFY_OT_auto_setup(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        scn = context.scene
-        base_collection = find_base_collection()
+        assets = scheduler.sync_assets(context.scene)
         
-        if not base_collection:
+        if not assets:
             self.report({'ERROR'}, "Base LOD collection (ending with _LOD00) not found")
             return {'CANCELLED'}
         
-        # Clear existing list
-        scn.lod.lod_list.clear()
-        
-        base_name = base_collection.name[:-5]  # Remove "_LOD00" from the end
-        
-        for i in range(4):
-            lod_name = f"{base_name}LOD{i:02d}"
-            if lod_name in bpy.data.collections:
-                item = scn.lod.lod_list.add()
-                item.ui_lod = bpy.data.collections[lod_name]
-                if i == 0:
-                    item.ui_rdf = True
-                    item.ui_rdv = True
-                elif i == 3:
-                    item.ui_dsp = True
+        for asset in assets:
+            base_name = asset.base.name[:-5]  # Remove "LOD00" from the end
+            lod_collections = {}
+            for i in range(4):
+                lod_name = f"{base_name}LOD{i:02d}"
+                if lod_name in bpy.data.collections:
+                    lod_collections[i] = bpy.data.collections[lod_name]
+            scheduler.fill_lod_list(asset, lod_collections)
 
         return {'FINISHED'}
 
-class LODIFY_OT_generate_lod_decimate(bpy.types.Operator):
-    bl_idname = "lodify.generate_lod_decimate"
-    bl_label = "Generate LODs using Decimate"
-    bl_options = {'REGISTER', 'UNDO'}
+class LODIFY_generate_lod_decimate_base:
+    # LOD generation shared by the regular and the undo-light operator. It is not an operator itself:
+    # registering an operator that subclasses another registered one breaks the parent.
+
+    # Undo-light generation records a rollback manifest instead of an undo step
+    record_manifest = False
 
     def execute(self, context):
         scn = context.scene
-        base_collection = find_base_collection()
+        assets = scheduler.schedule(scheduler.sync_assets(scn))
+        if self.asset_name:
+            assets = [asset for asset in assets if asset.name == self.asset_name]
         
-        if not base_collection:
+        if not assets:
             self.report({'ERROR'}, "Base LOD collection (ending with _LOD00) not found")
             return {'CANCELLED'}
+
+        # A new generation supersedes the manifest of the previous undo-light generation
+        manifest.discard_manifest(scn)
+        generation_manifest = manifest.GenerationManifest(scn) if self.record_manifest else None
         
-        base_name = base_collection.name[:-5]  # Remove "_LOD00" from the end
-        
-        # Clear existing list
-        scn.lod.lod_list.clear()
-        
-        total_objects = sum(1 for obj in base_collection.all_objects if obj.type == 'MESH' and not self.is_in_child_lod00(obj, base_collection)) * 3  # 3 LOD levels
-        processed_objects = 0
+        # (LOD00 object, LODn object) pairs for the normal map bake, of all assets
+        self.bake_pairs = []
+        self.cache_dir = mesh_cache.cache_directory(scn)
+        # Material copies made for the vertex color bake, freed per chunk when streaming
+        self.temp_materials = []
+        # Worker processes of the quadric engine, started on first use
+        self.quadric_pool = None
+
+        for asset in assets:
+            asset.status = 'QUEUED'
+            asset.progress = 0
+        self.total_objects = sum(self.count_objects(asset.base) for asset in assets) * 3  # 3 LOD levels
+        self.processed_objects = 0
+
+        # The LOD switching handlers stay out of the way while generating, and the vertex color and normal
+        # bakes need every LOD collection visible, including the ones hidden after a previous generation
+        handlers.set_generating(True)
+        hidden = handlers.show_layer_collections(context.view_layer)
+
+        # The manifest is written even if the generation fails, so its stash can still be reverted
+        try:
+            # Largest assets first
+            for asset in assets:
+                asset.status = 'RUNNING'
+                start = time.perf_counter()
+                try:
+                    self.generate_asset(context, asset, generation_manifest)
+                except Exception:
+                    asset.status = 'FAILED'
+                    if self.quadric_pool:
+                        self.quadric_pool.shutdown(cancel_futures=True)
+                    raise
+                asset.duration = time.perf_counter() - start
+                asset.status = 'DONE'
+                logging.info(f"Generated the LODs of {asset.name} in {asset.duration:.2f}s")
+
+            if self.quadric_pool:
+                self.quadric_pool.shutdown()
+
+            if scn.lod.cache_enabled:
+                mesh_cache.evict(self.cache_dir, scn.lod.cache_size_limit * 1024 * 1024)
+
+            if scn.lod.bake_normals and self.bake_pairs:
+                set_status_text(context, "Baking LOD normal maps")
+                baked, skipped = normal_bake.bake_normal_maps(context, self.bake_pairs, scn)
+                logging.info(f"Baked {baked} LOD normal maps, {skipped} unchanged")
+        finally:
+            handlers.hide_layer_collections(context.view_layer, hidden)
+            handlers.set_generating(False)
+            handlers.apply_visibility(scn, context.view_layer, handlers.viewport_mode(scn))
+            scn.lod.progress = 0
+            set_status_text(context, None)
+            if generation_manifest:
+                generation_manifest.finish(scn)
+
+        method = "quadric error decimation" if scn.lod.decimate_engine == 'QUADRIC' else "Decimate modifier (Planar Dissolve)"
+        self.report({'INFO'}, f"LODs of {len(assets)} asset(s) generated using {method}")
+        return {'FINISHED'}
+
+    def generate_asset(self, context, asset, generation_manifest):
+        scn = context.scene
+        base_collection = asset.base
+        base_name = base_collection.name[:-5]  # Remove "LOD00" from the end
+        parent = scheduler.lod_parent(scn, base_collection)
+        lod_collections = {0: base_collection}
+
+        # Cleaned working copy of each LOD00 mesh, shared by all LOD levels
+        self.working_meshes = {}
+        # Faces of the LOD00 objects never visible from outside of the asset, found once for all far LODs
+        self.hidden_faces = None
+
+        asset_objects = self.count_objects(base_collection)
 
         # Set color tag for base LOD
         base_collection.color_tag = 'COLOR_01'
         self.set_child_collection_colors(base_collection, 'COLOR_01')
-        
-        # Add base LOD to the list
-        item = scn.lod.lod_list.add()
-        item.ui_lod = base_collection
-        item.ui_rdf = True
-        item.ui_rdv = True
 
         for i in range(1, 4):  # Generate LOD01, LOD02, LOD03
             lod_name = f"{base_name}LOD{i:02d}"
@@ -117,10 +199,14 @@ class LODIFY_OT_generate_lod_decimate(bpy.types.Operator):
             
             if not lod_collection:
                 lod_collection = bpy.data.collections.new(lod_name)
-                scn.collection.children.link(lod_collection)
+                parent.children.link(lod_collection)
+            elif generation_manifest:
+                # Keep the existing objects around so the generation can be reverted
+                lod_collection = generation_manifest.stash_collection(lod_collection)
             else:
                 # Clear existing objects in the collection
                 self.clear_collection(lod_collection)
+            lod_collections[i] = lod_collection
             
             # Set color tag for LOD collection
             color_tag = f'COLOR_0{i+1}'
@@ -129,26 +215,32 @@ class LODIFY_OT_generate_lod_decimate(bpy.types.Operator):
             # Copy collection structure from base collection
             self.copy_collection_structure(base_collection, lod_collection, i, color_tag)
             
-            # Add LOD to the list
-            item = scn.lod.lod_list.add()
-            item.ui_lod = lod_collection
-            if i == 3:
-                item.ui_dsp = True
-            
             # Adjust angle for each LOD level
             angle = scn.lod.decimate_angle_increment * i
             
+            if self.hidden_faces is None and scn.lod.cull_hidden and i >= scn.lod.cull_min_lod:
+                set_status_text(context, f"Finding hidden geometry of {asset.name}")
+                objects = [obj for obj in base_collection.all_objects if obj.type == 'MESH']
+                self.hidden_faces = occlusion.find_hidden_faces(
+                    objects, self.read_working_meshes(objects, scn), scn.lod.cull_samples, scn.lod.cull_resolution)
+
+            self.cache_misses = []
             self.process_objects(base_collection, lod_collection, i, angle, scn, context)
+            if self.cache_misses:
+                self.store_cache_misses(context)
             
-            processed_objects += total_objects // 3
-            scn.lod.progress = (processed_objects / total_objects) * 100
-            context.workspace.status_text_set(f"Generating LODs: {scn.lod.progress:.1f}%")
-            bpy.ops.wm.redraw_timer(type='DRAW_WIN_SWAP', iterations=1)
+            self.processed_objects += asset_objects
+            asset.progress = i / 3 * 100
+            scn.lod.progress = (self.processed_objects / max(self.total_objects, 1)) * 100
+            set_status_text(context, f"Generating LODs of {asset.name}: {scn.lod.progress:.1f}%")
+            if not bpy.app.background:
+                bpy.ops.wm.redraw_timer(type='DRAW_WIN_SWAP', iterations=1)
 
-        scn.lod.progress = 0
-        context.workspace.status_text_set(None)
-        self.report({'INFO'}, "LODs generated using Decimate modifier (Planar Dissolve)")
-        return {'FINISHED'}
+        bpy.data.batch_remove(list(self.working_meshes.values()))
+        scheduler.fill_lod_list(asset, lod_collections)
+
+    def count_objects(self, base_collection):
+        return sum(1 for obj in base_collection.all_objects if obj.type == 'MESH' and not self.is_in_child_lod00(obj, base_collection))
 
     def copy_collection_structure(self, source_collection, target_collection, lod_level, color_tag):
         for child in source_collection.children:
@@ -158,49 +250,216 @@ class LODIFY_OT_generate_lod_decimate(bpy.types.Operator):
             self.copy_collection_structure(child, new_child, lod_level, color_tag)
 
     def process_objects(self, source_collection, target_collection, lod_level, angle, scn, context):
+        work = self.collect_work(source_collection, target_collection)
+        # Objects waiting for the quadric engine, simplified together
+        self.quadric_objects = []
+        if scn.lod.streaming_enabled:
+            self.stream_objects(work, lod_level, angle, scn, context)
+            return
+        for obj, source, target in work:
+            self.process_object(obj, source, target, lod_level, angle, scn)
+        self.decimate_quadric(self.quadric_objects, lod_level, scn)
+
+    def collect_work(self, source_collection, target_collection, work=None):
+        # Flattens the collection hierarchy into (object, source collection, target collection) items
+        if work is None:
+            work = []
         for obj in source_collection.objects:
-            if obj.type == 'MESH' and not self.is_in_child_lod00(obj, source_collection):
-                # Check if the object is too small for higher LODs
-                if scn.lod.small_object_threshold > 0 and self.is_object_too_small(obj, scn.lod.small_object_threshold):
-                    continue
+            work.append((obj, source_collection, target_collection))
 
-                new_obj = obj.copy()
-                new_obj.data = obj.data.copy()
-                target_collection.objects.link(new_obj)
-                
-                if lod_level in [2, 3]:  # For LOD02 and LOD03
-                    # Convert MSFS materials to Blender materials
-                    self.convert_materials(new_obj)
-
-                    # Bake to vertex colors
-                    self.bake_to_vertex_colors(new_obj)
-                    # Remove all materials from the object after baking
-                    new_obj.data.materials.clear()
-                
-                # Rename the object
-                new_obj.name = f"{obj.name}_LOD{lod_level:02d}"
-                
+        # Process child collections
+        for child in source_collection.children:
+            child_target = next((c for c in target_collection.children if c.name.startswith(child.name)), None)
+            if child_target:
+                self.collect_work(child, child_target, work)
+        return work
+
+    def stream_objects(self, work, lod_level, angle, scn, context):
+        # Runs the full pipeline chunk by chunk so only one chunk of intermediate meshes is alive at a time
+        sizer = streaming.ChunkSizer(scn.lod.stream_chunk_size, scn.lod.stream_memory_limit)
+        start = 0
+        while start < len(work):
+            chunk = work[start:start + sizer.size]
+            start += len(chunk)
+
+            self.cache_misses = []
+            self.temp_materials = []
+            new_objects = [self.process_object(obj, source, target, lod_level, angle, scn) for obj, source, target in chunk]
+            self.decimate_quadric(self.quadric_objects, lod_level, scn)
+            self.quadric_objects = []
+
+            depsgraph = context.evaluated_depsgraph_get()
+            if self.cache_misses:
+                self.store_cache_misses(context)
+                self.cache_misses = []
+            streaming.apply_modifiers([obj for obj in new_objects if obj], depsgraph)
+            streaming.free_unused(self.temp_materials)
+            self.free_working_meshes([obj for obj, source, target in chunk])
+
+            set_status_text(context, f"Generating LOD{lod_level:02d}: {start}/{len(work)} objects (chunk {sizer.size})")
+            sizer.update()
+
+    def process_object(self, obj, source_collection, target_collection, lod_level, angle, scn):
+        if obj.type == 'MESH' and not self.is_in_child_lod00(obj, source_collection):
+            # Check if the object is too small for higher LODs
+            if scn.lod.small_object_threshold > 0 and self.is_object_too_small(obj, scn.lod.small_object_threshold):
+                return None
+
+            # Fully enclosed objects have nothing left on the LODs hidden geometry is removed from
+            hidden = self.hidden_faces_for(obj, lod_level, scn)
+            if hidden is not None and len(hidden) >= len(self.working_mesh(obj, scn).polygons):
+                return None
+
+            # Objects with their own modifiers are not cached, the key only covers the mesh data
+            cache_key = None
+            if scn.lod.cache_enabled and not obj.modifiers:
+                cache_key = self.cache_key(obj, lod_level, angle, scn)
+                cached = mesh_cache.load(self.cache_dir, cache_key)
+                if cached:
+                    new_obj = self.copy_from_cache(obj, cached, lod_level)
+                    target_collection.objects.link(new_obj)
+                    self.bake_pairs.append((obj, new_obj))
+                    return new_obj
+
+            new_obj = obj.copy()
+            new_obj.data = self.working_mesh(obj, scn).copy()
+            target_collection.objects.link(new_obj)
+
+            # Remove the faces that can't be seen from the distance this LOD is shown at
+            if hidden is not None:
+                occlusion.delete_faces(new_obj.data, hidden)
+            
+            if lod_level in [2, 3]:  # For LOD02 and LOD03
+                # Convert MSFS materials to Blender materials
+                self.convert_materials(new_obj)
+
+                # Bake to vertex colors
+                self.bake_to_vertex_colors(new_obj)
+                # Remove all materials from the object after baking
+                new_obj.data.materials.clear()
+            
+            # Rename the object
+            new_obj.name = f"{obj.name}_LOD{lod_level:02d}"
+            self.bake_pairs.append((obj, new_obj))
+            
+            if scn.lod.decimate_engine == 'QUADRIC':
+                self.quadric_objects.append(new_obj)
+            else:
                 # Add decimate modifier
                 decimate = new_obj.modifiers.new(name="LOD_Decimate", type='DECIMATE')
                 decimate.decimate_type = 'DISSOLVE'
                 decimate.angle_limit = angle * (3.14159 / 180)  # Convert to radians
                 decimate.use_dissolve_boundaries = False
                 decimate.delimit = {'UV'}
-                
-            else:
-                # For non-mesh objects (e.g., lights), just duplicate them
-                new_obj = obj.copy()
-                if obj.data:
-                    new_obj.data = obj.data.copy()
-                target_collection.objects.link(new_obj)
-                new_obj.name = f"{obj.name}_LOD{lod_level:02d}"
 
-        # Process child collections
-        for child in source_collection.children:
-            child_target = next((c for c in target_collection.children if c.name.startswith(child.name)), None)
-            if child_target:
-                self.process_objects(child, child_target, lod_level, angle, scn, context)
+            if cache_key:
+                self.cache_misses.append((new_obj, cache_key, lod_level not in [2, 3]))
+            
+        else:
+            # For non-mesh objects (e.g., lights), just duplicate them
+            new_obj = obj.copy()
+            if obj.data:
+                new_obj.data = obj.data.copy()
+            target_collection.objects.link(new_obj)
+            new_obj.name = f"{obj.name}_LOD{lod_level:02d}"
+        return new_obj
                 
+    def decimate_quadric(self, objects, lod_level, scn):
+        # Simplifies the meshes with the NumPy kernel, in worker processes unless there's a single one
+        if not objects:
+            return
+        ratio = scn.lod.quadric_ratio ** lod_level
+        jobs = [mesh_cache.read_mesh_arrays(obj.data) for obj in objects]
+        if scn.lod.quadric_workers == 1 or len(jobs) == 1:
+            results = [quadric.decimate(arrays, [color["domain"] for color in meta["colors"]], ratio) for arrays, meta in jobs]
+        else:
+            if self.quadric_pool is None:
+                # Spawned so the workers don't inherit the state of Blender
+                self.quadric_pool = ProcessPoolExecutor(max_workers=scn.lod.quadric_workers or None,
+                                                        mp_context=multiprocessing.get_context('spawn'))
+            futures = [self.quadric_pool.submit(quadric.decimate, arrays, [color["domain"] for color in meta["colors"]], ratio)
+                       for arrays, meta in jobs]
+            results = [future.result() for future in futures]
+
+        for obj, (arrays, meta), result in zip(objects, jobs, results):
+            old_mesh = obj.data
+            name = old_mesh.name
+            mesh = mesh_cache.build_mesh(name, result, meta)
+            for material in old_mesh.materials:
+                mesh.materials.append(material)
+            obj.data = mesh
+            if old_mesh.users == 0:
+                bpy.data.meshes.remove(old_mesh)
+            mesh.name = name
+
+    def working_mesh(self, obj, scn):
+        if not scn.lod.cleanup_enabled:
+            return obj.data
+        mesh = self.working_meshes.get(obj.data.name)
+        if mesh is None:
+            mesh = obj.data.copy()
+            mesh.name = f"{obj.data.name}_Cleanup"
+            welded, faces, edges, verts = mesh_cleanup.clean_mesh(mesh, scn.lod.cleanup_merge_distance)
+            logging.debug(f"Cleaned {obj.data.name}: {welded} welded, {faces} faces, {edges} edges, {verts} vertices removed")
+            self.working_meshes[obj.data.name] = mesh
+        return mesh
+
+    def read_working_meshes(self, objects, scn):
+        # Yields the working meshes one at a time. When streaming, each one is freed once read,
+        # so the full set of cleaned copies is never alive at once.
+        for obj in objects:
+            yield self.working_mesh(obj, scn)
+            if scn.lod.streaming_enabled:
+                self.free_working_meshes([obj])
+
+    def free_working_meshes(self, objects):
+        # Streaming frees the working meshes of every chunk, they are cleaned again for the next LOD level
+        meshes = [self.working_meshes.pop(obj.data.name) for obj in objects
+                  if obj.type == 'MESH' and obj.data and obj.data.name in self.working_meshes]
+        if meshes:
+            bpy.data.batch_remove(meshes)
+
+    def hidden_faces_for(self, obj, lod_level, scn):
+        if not self.hidden_faces or not scn.lod.cull_hidden or lod_level < scn.lod.cull_min_lod:
+            return None
+        return self.hidden_faces.get(obj.name)
+
+    def cache_key(self, obj, lod_level, angle, scn):
+        bake_vertex_colors = lod_level in [2, 3]
+        if scn.lod.decimate_engine == 'QUADRIC':
+            params = ('QUADRIC', quadric.QUADRIC_VERSION, scn.lod.quadric_ratio ** lod_level, bake_vertex_colors)
+        else:
+            params = ('DISSOLVE', angle, bake_vertex_colors)
+        if scn.lod.cleanup_enabled:
+            params += ('CLEANUP', scn.lod.cleanup_merge_distance)
+        # Hidden faces depend on the rest of the asset, not only on this mesh
+        hidden = self.hidden_faces_for(obj, lod_level, scn)
+        if hidden is not None:
+            params += ('CULL', hashlib.blake2b(hidden.tobytes(), digest_size=16).hexdigest())
+        if bake_vertex_colors:
+            params += (mesh_cache.material_signature(obj.data),)
+        return mesh_cache.mesh_key(obj.data, params)
+
+    def copy_from_cache(self, obj, cached, lod_level):
+        arrays, meta = cached
+        new_obj = obj.copy()
+        mesh = mesh_cache.build_mesh(f"{obj.data.name}_LOD{lod_level:02d}", arrays, meta)
+        if meta["keep_materials"]:
+            for material in obj.data.materials:
+                mesh.materials.append(material)
+        new_obj.data = mesh
+        new_obj.name = f"{obj.name}_LOD{lod_level:02d}"
+        return new_obj
+
+    def store_cache_misses(self, context):
+        depsgraph = context.evaluated_depsgraph_get()
+        for new_obj, cache_key, keep_materials in self.cache_misses:
+            obj_eval = new_obj.evaluated_get(depsgraph)
+            arrays, meta = mesh_cache.read_mesh_arrays(obj_eval.to_mesh())
+            obj_eval.to_mesh_clear()
+            meta["keep_materials"] = keep_materials
+            mesh_cache.store(self.cache_dir, cache_key, arrays, meta)
+
     def clear_collection(self, collection):
         for obj in list(collection.objects):
             bpy.data.objects.remove(obj, do_unlink=True)
@@ -229,6 +488,7 @@ class LODIFY_OT_generate_lod_decimate(bpy.types.Operator):
                 # Create a copy of the original material
                 new_material = slot.material.copy()
                 slot.material = new_material
+                self.temp_materials.append(new_material)
 
                 # Call the conversion operator
                 bpy.ops.lodify.convert_msfs_to_blender(material_name=new_material.name)
@@ -303,6 +563,242 @@ class LODIFY_OT_generate_lod_decimate(bpy.types.Operator):
         if hasattr(obj.data.attributes, 'active_color'):
             obj.data.attributes.active_color = obj.data.attributes[color_attribute_name]
             
+class LODIFY_OT_generate_lod_decimate(LODIFY_generate_lod_decimate_base, bpy.types.Operator):
+    bl_idname = "lodify.generate_lod_decimate"
+    bl_label = "Generate LODs using Decimate"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    asset_name: bpy.props.StringProperty(
+        description="Only generate the LODs of this asset, all assets when empty",
+        options={'SKIP_SAVE'}
+    )
+
+class LODIFY_OT_generate_lod_decimate_light(LODIFY_generate_lod_decimate_base, bpy.types.Operator):
+    bl_idname = "lodify.generate_lod_decimate_light"
+    bl_label = "Generate LODs using Decimate (Undo-Light)"
+    bl_description = "Generate LODs without an undo step, recording a manifest for Revert Last Generation instead"
+    bl_options = {'REGISTER'}
+
+    record_manifest = True
+
+    asset_name: bpy.props.StringProperty(
+        description="Only generate the LODs of this asset, all assets when empty",
+        options={'SKIP_SAVE'}
+    )
+
+class LODIFY_OT_generate_lod_queue(bpy.types.Operator):
+    bl_idname = "lodify.generate_lod_queue"
+    bl_label = "Generate LODs in Background Workers"
+    bl_description = "Generate the LODs of every asset in parallel background Blender processes, largest asset first, and import the results"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    _timer = None
+
+    def execute(self, context):
+        scn = context.scene
+        assets = scheduler.schedule(scheduler.sync_assets(scn))
+        if not assets:
+            self.report({'ERROR'}, "Base LOD collection (ending with _LOD00) not found")
+            return {'CANCELLED'}
+
+        # The queue replaces the LOD collections without recording a manifest, an older one would revert
+        # the imported LODs by name and restore a stale stash
+        manifest.discard_manifest(scn)
+
+        # Workers load a copy of the current state of the file, saved or not
+        self.temp_dir = tempfile.mkdtemp(prefix="lodify_")
+        self.blend_path = os.path.join(self.temp_dir, "source.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=self.blend_path, copy=True)
+
+        self.scene_name = scn.name
+        self.pending = [asset.name for asset in assets]
+        # Asset name -> (process, output file, log file, start time)
+        self.running = {}
+        self.total = len(self.pending)
+        self.finished = 0
+        self.failed = 0
+        for asset in assets:
+            asset.status = 'QUEUED'
+            asset.progress = 0
+            asset.duration = 0
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.5, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.cancel(context)
+            self.report({'WARNING'}, "LOD generation cancelled")
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        scn = bpy.data.scenes.get(self.scene_name)
+        if scn is None:
+            self.cancel(context)
+            return {'CANCELLED'}
+
+        self.poll_workers(scn)
+        self.launch_workers(scn)
+        scn.lod.progress = self.finished / self.total * 100
+        if context.screen:
+            for area in context.screen.areas:
+                area.tag_redraw()
+
+        if self.pending or self.running:
+            return {'PASS_THROUGH'}
+
+        self.finish(context)
+        scn.lod.progress = 0
+        if self.failed:
+            self.report({'WARNING'}, f"LODs of {self.finished - self.failed} asset(s) generated, {self.failed} failed")
+        else:
+            self.report({'INFO'}, f"LODs of {self.finished} asset(s) generated in background workers")
+        return {'FINISHED'}
+
+    def launch_workers(self, scn):
+        while self.pending and len(self.running) < scn.lod.max_workers:
+            name = self.pending.pop(0)
+            asset = scn.lod.assets.get(name)
+            if asset is None:
+                self.finished += 1
+                continue
+            index = self.total - len(self.pending)
+            output_path = os.path.join(self.temp_dir, f"asset_{index}.blend")
+            log_path = os.path.join(self.temp_dir, f"asset_{index}.log")
+            try:
+                process = scheduler.launch_worker(self.blend_path, self.scene_name, name, output_path, log_path)
+            except OSError as e:
+                logging.error(f"Could not start the LOD worker for {name}: {e}")
+                asset.status = 'FAILED'
+                self.finished += 1
+                self.failed += 1
+                continue
+            self.running[name] = (process, output_path, log_path, time.perf_counter())
+            asset.status = 'RUNNING'
+
+    def poll_workers(self, scn):
+        for name, (process, output_path, log_path, start) in list(self.running.items()):
+            asset = scn.lod.assets.get(name)
+            if asset:
+                asset.duration = time.perf_counter() - start
+            returncode = process.poll()
+            if returncode is None:
+                continue
+
+            del self.running[name]
+            self.finished += 1
+            if asset is None:
+                continue
+            if returncode == 0 and os.path.exists(output_path):
+                scheduler.import_worker_result(scn, asset, output_path)
+                asset.status = 'DONE'
+                asset.progress = 100
+                logging.info(f"Generated the LODs of {name} in {asset.duration:.2f}s")
+            else:
+                asset.status = 'FAILED'
+                self.failed += 1
+                with open(log_path, errors='replace') as f:
+                    logging.error(f"LOD worker for {name} failed with exit code {returncode}:\n{f.read()[-4000:]}")
+
+    def finish(self, context):
+        if self._timer:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def cancel(self, context):
+        for process, output_path, log_path, start in self.running.values():
+            process.terminate()
+        for process, output_path, log_path, start in self.running.values():
+            process.wait()
+        scn = bpy.data.scenes.get(self.scene_name)
+        if scn:
+            for asset in scn.lod.assets:
+                if asset.status in {'QUEUED', 'RUNNING'}:
+                    asset.status = 'IDLE'
+            scn.lod.progress = 0
+        self.running = {}
+        self.pending = []
+        self.finish(context)
+
+class LODIFY_OT_revert_last_generation(bpy.types.Operator):
+    bl_idname = "lodify.revert_last_generation"
+    bl_label = "Revert Last Generation"
+    bl_description = "Remove the datablocks created by the last undo-light generation and restore the previous LOD collections"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.lod.generation_manifest)
+
+    def execute(self, context):
+        if not manifest.revert_manifest(context.scene):
+            self.report({'WARNING'}, "No generation to revert")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, "Reverted last LOD generation")
+        return {'FINISHED'}
+
+class LODIFY_OT_bake_lod_normals(bpy.types.Operator):
+    bl_idname = "lodify.bake_lod_normals"
+    bl_label = "Bake LOD Normal Maps"
+    bl_description = "Bake the normals of the LOD00 objects onto their LOD counterparts and assign them as MSFS normal textures"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scn = context.scene
+        pairs = normal_bake.find_lod_pairs(scn)
+        if not pairs:
+            self.report({'WARNING'}, "No LOD objects with a matching LOD00 object found")
+            return {'CANCELLED'}
+
+        baked, skipped = normal_bake.bake_normal_maps(context, pairs, scn)
+        self.report({'INFO'}, f"Baked {baked} normal maps, skipped {skipped} unchanged")
+        return {'FINISHED'}
+
+class LODIFY_OT_clear_mesh_cache(bpy.types.Operator):
+    bl_idname = "lodify.clear_mesh_cache"
+    bl_label = "Clear Mesh Cache"
+    bl_description = "Delete all cached LOD meshes from disk"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        mesh_cache.clear(mesh_cache.cache_directory(context.scene))
+        self.report({'INFO'}, "LOD mesh cache cleared")
+        return {'FINISHED'}
+
+class LODIFY_OT_analyze_lod_budget(bpy.types.Operator):
+    bl_idname = "lodify.analyze_lod_budget"
+    bl_label = "Analyze LOD Budget"
+    bl_description = "Count triangles, vertices, draw calls, materials and texture memory per LOD and check them against the MSFS budgets"
+    bl_options = {'REGISTER'}
+
+    report_path: bpy.props.StringProperty(
+        description="Optional JSON file the report is written to, for headless tooling",
+        subtype='FILE_PATH'
+    )
+
+    def execute(self, context):
+        scn = context.scene
+        if not any(item.ui_lod for asset in scn.lod.assets for item in asset.lod_list):
+            self.report({'ERROR'}, "No LOD collections to analyze")
+            return {'CANCELLED'}
+
+        report = budget.analyze_lods(scn, context.evaluated_depsgraph_get())
+        budget.store_report(scn, report)
+        if self.report_path:
+            with open(bpy.path.abspath(self.report_path), "w") as f:
+                json.dump(report, f, indent=2)
+
+        if report["violations"]:
+            self.report({'WARNING'}, f"{report['violations']} LOD budget violation(s) found")
+        else:
+            self.report({'INFO'}, "All LODs are within budget")
+        return {'FINISHED'}
+
 class LODIFY_OT_generate_lod_shrinkwrap(bpy.types.Operator):
     bl_idname = "lodify.generate_lod_shrinkwrap"
     bl_label = "Generate LODs using Shrinkwrap"
@@ -368,12 +864,12 @@ class LODIFY_OT_apply_lod_modifiers(bpy.types.Operator):
     lod_index: bpy.props.IntProperty()
 
     def execute(self, context):
-        scn = context.scene
-        if self.lod_index < 0 or self.lod_index >= len(scn.lod.lod_list):
+        asset = context.scene.lod.active_asset()
+        if asset is None or self.lod_index < 0 or self.lod_index >= len(asset.lod_list):
             self.report({'ERROR'}, "Invalid LOD index")
             return {'CANCELLED'}
 
-        lod_collection = scn.lod.lod_list[self.lod_index].ui_lod
+        lod_collection = asset.lod_list[self.lod_index].ui_lod
         if not lod_collection:
             self.report({'ERROR'}, "LOD collection not found")
             return {'CANCELLED'}
@@ -469,26 +965,48 @@ class LODIFY_OT_convert_msfs_to_blender(bpy.types.Operator):
 
 class LODIFY_OT_convert_blender_to_msfs(bpy.types.Operator):
     bl_idname = "lodify.convert_blender_to_msfs"
-    bl_label = "Convert All Blender to MSFS Materials"
+    bl_label = "Convert LOD Blender Materials to MSFS"
+    bl_description = "Convert the Blender materials used by the LOD collections to MSFS materials, skipping unchanged ones"
     bl_options = {'REGISTER', 'UNDO'}
 
+    # Principled BSDF inputs read by the conversion, and part of the material signature
+    PRINCIPLED_INPUTS = ('Base Color', 'Metallic', 'Roughness', 'Emission', 'Alpha')
+    SIGNATURE_PROPERTY = "lodify_msfs_signature"
+
     def execute(self, context):
         try:
             converted_count = 0
             skipped_count = 0
 
-            for material in bpy.data.materials:
-                if material.use_nodes:
-                    # Check if the material is already an MSFS material
-                    if hasattr(material, 'msfs_material_type') and material.msfs_material_type != 'NONE':
+            lod_materials = self.lod_material_index(context.scene)
+            if not lod_materials:
+                self.report({'WARNING'}, "No materials used by the LOD collections")
+                return {'CANCELLED'}
+
+            for material in lod_materials.values():
+                if not material.use_nodes:
+                    skipped_count += 1
+                    continue
+
+                # The signature only detects unchanged node trees between runs. Within a run every material is
+                # resolved once (lod_material_index is unique per material), so nothing else is keyed on it.
+                signature = self.node_tree_signature(material)
+                if hasattr(material, 'msfs_material_type') and material.msfs_material_type != 'NONE':
+                    # Skip MSFS materials that were authored by hand or converted from an unchanged node tree
+                    if material.get(self.SIGNATURE_PROPERTY) in (None, signature):
                         skipped_count += 1
                         continue
 
-                    # Convert the material
-                    self.convert_material(material, context)
-                    converted_count += 1
-                else:
+                resolved = self.resolve_material(material)
+                if resolved is None:
+                    self.report({'WARNING'}, f"No Principled BSDF node found in material '{material.name}'. Skipping.")
                     skipped_count += 1
+                    continue
+
+                # Convert the material
+                self.convert_material(material, resolved)
+                material[self.SIGNATURE_PROPERTY] = signature
+                converted_count += 1
 
             self.report({'INFO'}, f"Converted {converted_count} materials. Skipped {skipped_count} materials.")
         except Exception as e:
@@ -497,39 +1015,93 @@ class LODIFY_OT_convert_blender_to_msfs(bpy.types.Operator):
             return {'CANCELLED'}
         return {'FINISHED'}
 
-    def convert_material(self, material, context):
-        # Ensure MSFS properties exist on the material
-        if not hasattr(material, 'msfs_material_type'):
-            material.msfs_material_type = 'NONE'
+    def lod_material_index(self, scn):
+        # Material name -> material, for the materials of the objects in the LOD collections, in one pass
+        materials = {}
+        seen = set()
+        lod_collections = [item.ui_lod for asset in scn.lod.assets for item in asset.lod_list if item.ui_lod]
+        for collection in lod_collections:
+            for obj in collection.all_objects:
+                if obj.name in seen:
+                    continue
+                seen.add(obj.name)
+                for slot in obj.material_slots:
+                    if slot.material:
+                        materials[slot.material.name] = slot.material
+        return materials
+
+    def node_tree_signature(self, material):
+        hasher = hashlib.blake2b(digest_size=16)
+        for node in material.node_tree.nodes:
+            entry = [node.bl_idname, node.name]
+            if node.type == 'TEX_IMAGE':
+                entry.append(node.image.name if node.image else None)
+            elif node.type == 'BSDF_PRINCIPLED':
+                for input_name in self.PRINCIPLED_INPUTS:
+                    value = self.safe_get_input(node, input_name, None)
+                    entry.append(tuple(value) if hasattr(value, '__len__') else value)
+            hasher.update(repr(entry).encode())
+        for link in material.node_tree.links:
+            hasher.update(repr((link.from_node.name, link.from_socket.identifier,
+                                link.to_node.name, link.to_socket.identifier)).encode())
+        return hasher.hexdigest()
+
+    def resolve_material(self, material):
+        # Single pass over the links: (node name, socket identifier) -> node linked into it
+        linked = {(link.to_node.name, link.to_socket.identifier): link.from_node for link in material.node_tree.links}
+
+        principled = next((node for node in material.node_tree.nodes if node.type == 'BSDF_PRINCIPLED'), None)
+        if not principled:
+            return None
 
-        # Your existing convert_material function here
-        # Make sure to remove any references to obj and use material directly
         def ensure_4_elements(color):
             if len(color) == 3:
                 return list(color) + [1.0]
             return list(color)
 
-        principled = next((node for node in material.node_tree.nodes if node.type == 'BSDF_PRINCIPLED'), None)
-        if not principled:
-            self.report({'WARNING'}, f"No Principled BSDF node found in material '{material.name}'. Skipping.")
-            return
+        def linked_node(node, input_name):
+            if input_name in node.inputs:
+                return linked.get((node.name, node.inputs[input_name].identifier))
+            return None
 
-        # Log original values
-        original_color = ensure_4_elements(self.safe_get_input(principled, 'Base Color', (0.8, 0.8, 0.8, 1.0)))
-        original_metallic = self.safe_get_input(principled, 'Metallic', 0.0)
-        original_roughness = self.safe_get_input(principled, 'Roughness', 0.5)
-        original_emission = ensure_4_elements(self.safe_get_input(principled, 'Emission', (0.0, 0.0, 0.0, 1.0)))
-        original_alpha = self.safe_get_input(principled, 'Alpha', 1.0)
+        def linked_texture(node, input_name):
+            from_node = linked_node(node, input_name)
+            if from_node and from_node.type == 'TEX_IMAGE':
+                return from_node.image
+            return None
+
+        normal_texture = None
+        normal_map = linked_node(principled, 'Normal')
+        if normal_map and normal_map.type == 'NORMAL_MAP':
+            tex_node = linked.get((normal_map.name, normal_map.inputs[0].identifier))
+            if tex_node and tex_node.type == 'TEX_IMAGE':
+                normal_texture = tex_node.image
+
+        return {
+            'color': ensure_4_elements(self.safe_get_input(principled, 'Base Color', (0.8, 0.8, 0.8, 1.0))),
+            'metallic': self.safe_get_input(principled, 'Metallic', 0.0),
+            'roughness': self.safe_get_input(principled, 'Roughness', 0.5),
+            'emission': ensure_4_elements(self.safe_get_input(principled, 'Emission', (0.0, 0.0, 0.0, 1.0))),
+            'alpha': self.safe_get_input(principled, 'Alpha', 1.0),
+            'base_color_texture': linked_texture(principled, 'Base Color'),
+            'metallic_texture': linked_texture(principled, 'Metallic'),
+            'normal_texture': normal_texture,
+        }
+
+    def convert_material(self, material, resolved):
+        # Ensure MSFS properties exist on the material
+        if not hasattr(material, 'msfs_material_type'):
+            material.msfs_material_type = 'NONE'
 
         # Set the material type to standard
         material.msfs_material_type = 'msfs_standard'
 
         # Transfer parameters
-        material.msfs_base_color_factor = original_color
-        material.msfs_metallic_factor = original_metallic
-        material.msfs_roughness_factor = original_roughness
-        material.msfs_emissive_factor = original_emission[:3]  # Only use RGB
-        material.msfs_alpha_cutoff = original_alpha
+        material.msfs_base_color_factor = resolved['color']
+        material.msfs_metallic_factor = resolved['metallic']
+        material.msfs_roughness_factor = resolved['roughness']
+        material.msfs_emissive_factor = resolved['emission'][:3]  # Only use RGB
+        material.msfs_alpha_cutoff = resolved['alpha']
 
         # Additional MSFS-specific parameters
         material.msfs_normal_scale = 1.0
@@ -538,17 +1110,10 @@ class LODIFY_OT_convert_blender_to_msfs(bpy.types.Operator):
         material.msfs_detail_uv_offset_v = 0.0
 
         # Handle textures
-        material.msfs_base_color_texture = self.get_linked_texture(principled, 'Base Color')
-        material.msfs_occlusion_metallic_roughness_texture = self.get_linked_texture(principled, 'Metallic')
-
-        # Handle normal map
-        if 'Normal' in principled.inputs and principled.inputs['Normal'].is_linked:
-            from_node = principled.inputs['Normal'].links[0].from_node
-            if from_node.type == 'NORMAL_MAP':
-                if from_node.inputs[0].is_linked:
-                    tex_node = from_node.inputs[0].links[0].from_node
-                    if tex_node.type == 'TEX_IMAGE':
-                        material.msfs_normal_texture = tex_node.image
+        material.msfs_base_color_texture = resolved['base_color_texture']
+        material.msfs_occlusion_metallic_roughness_texture = resolved['metallic_texture']
+        if resolved['normal_texture']:
+            material.msfs_normal_texture = resolved['normal_texture']
 
         # Force an update
         material.update_tag()
@@ -559,13 +1124,6 @@ class LODIFY_OT_convert_blender_to_msfs(bpy.types.Operator):
         logging.warning(f"Input '{input_name}' not found in node. Using default value.")
         return default_value
 
-    def get_linked_texture(self, principled, input_name):
-        if input_name in principled.inputs and principled.inputs[input_name].is_linked:
-            from_node = principled.inputs[input_name].links[0].from_node
-            if from_node.type == 'TEX_IMAGE':
-                return from_node.image
-        return None
-
 class LODIFY_OT_bake_to_vertex_colors(bpy.types.Operator):
     bl_idname = "lodify.bake_to_vertex_colors"
     bl_label = "Bake Textures to Vertex Colors"
@@ -659,6 +1217,12 @@ classes = (
     LODIFY_OT_list_actions,
     LODIFY_OT_auto_setup,
     LODIFY_OT_generate_lod_decimate,
+    LODIFY_OT_generate_lod_decimate_light,
+    LODIFY_OT_generate_lod_queue,
+    LODIFY_OT_revert_last_generation,
+    LODIFY_OT_bake_lod_normals,
+    LODIFY_OT_clear_mesh_cache,
+    LODIFY_OT_analyze_lod_budget,
     LODIFY_OT_generate_lod_shrinkwrap,
     LODIFY_OT_apply_lod_modifiers,
     LODIFY_OT_convert_msfs_to_blender,
@@ -1,7 +1,8 @@
 # properties.py
 
 import bpy
-from bpy.props import FloatProperty, IntProperty, BoolProperty, PointerProperty, CollectionProperty, StringProperty
+from bpy.props import FloatProperty, IntProperty, BoolProperty, PointerProperty, CollectionProperty, StringProperty, EnumProperty
+from . import handlers
 
 class LODIFY_props_list(bpy.types.PropertyGroup):
     ui_idx : IntProperty(description='UI List Index')
@@ -9,13 +10,56 @@ class LODIFY_props_list(bpy.types.PropertyGroup):
     ui_dsp : BoolProperty(default=False, description="Set this collection as active LOD in the viewport only")
     ui_rdv : BoolProperty(default=False, description="Set this collection as active LOD in the rendered view only")
     ui_rdf : BoolProperty(default=False, description="Set this collection as active LOD in the final render only")
+    ui_min_size : FloatProperty(
+        name="Min Size",
+        description="Minimum screen size (percent of the view height covered by the bounding sphere) at which this LOD is shown, as the MSFS minSize",
+        default=0.0,
+        min=0.0,
+        max=100.0,
+        precision=1,
+        subtype='PERCENTAGE'
+    )
 
-class LODIFY_props_scn(bpy.types.PropertyGroup):
+class LODIFY_props_asset(bpy.types.PropertyGroup):
+    base : PointerProperty(type=bpy.types.Collection, description='Base (_LOD00) collection of the asset')
     lod_list : CollectionProperty(type=LODIFY_props_list)
     lod_list_index : IntProperty()
+    status : EnumProperty(
+        items=(
+            ('IDLE', "Idle", ""),
+            ('QUEUED', "Queued", ""),
+            ('RUNNING', "Running", ""),
+            ('DONE', "Done", ""),
+            ('FAILED', "Failed", ""),
+        ),
+        default='IDLE'
+    )
+    progress : FloatProperty(default=0.0, min=0.0, max=100.0, subtype='PERCENTAGE')
+    duration : FloatProperty(default=0.0, description="Duration of the last generation in seconds")
+
+class LODIFY_props_scn(bpy.types.PropertyGroup):
+    assets : CollectionProperty(type=LODIFY_props_asset)
+    assets_index : IntProperty()
+    # Scene-level LOD list of files saved before assets existed, moved into its asset on load
+    lod_list : CollectionProperty(type=LODIFY_props_list, options={'HIDDEN'})
+    lod_list_index : IntProperty(options={'HIDDEN'})
     lod_enabled : BoolProperty(default=False, description='Enable the LOD system for collections.')
     p_rdf_switch : BoolProperty(default=True, description='Automatically change the LOD on final render')
     p_rdv_switch : BoolProperty(default=True, description='Automatically change the LOD on rendered view')
+    preview_enabled : BoolProperty(
+        name="Distance Preview",
+        description="Pick the active LOD in the viewport from the view distance and the LOD Min Size, like MSFS does",
+        default=False,
+        update=handlers.update_preview_timer
+    )
+    preview_interval : FloatProperty(
+        name="Preview Interval (s)",
+        description="How often the distance preview checks the view position",
+        default=0.25,
+        min=0.05,
+        max=5.0,
+        precision=2
+    )
     progress : FloatProperty(default=0.0, min=0.0, max=100.0, subtype='PERCENTAGE')
     small_object_threshold : FloatProperty(
         name="Small Object Threshold (m)",
@@ -44,15 +88,199 @@ class LODIFY_props_scn(bpy.types.PropertyGroup):
         step=5,
         # unit='ROTATION'
     )
+    decimate_engine : EnumProperty(
+        name="Decimation",
+        description="How the LOD meshes are simplified",
+        items=(
+            ('DISSOLVE', "Planar Dissolve", "Decimate modifier in planar mode, driven by the angle increment"),
+            ('QUADRIC', "Quadric Error", "Edge collapse with quadric error metrics over the positions, UVs and colors, run in parallel worker processes. About 3,000 to 5,000 collapses per second per object, the collapse loop and its connectivity are plain Python: a 250k triangle mesh takes ~35s to reach 10%"),
+        ),
+        default='DISSOLVE'
+    )
+    quadric_ratio : FloatProperty(
+        name="Triangle Ratio",
+        description="Fraction of the triangles kept by each LOD level compared to the previous one",
+        default=0.5,
+        min=0.01,
+        max=1.0,
+        subtype='FACTOR'
+    )
+    quadric_workers : IntProperty(
+        name="Worker Processes",
+        description="Processes simplifying meshes in parallel with the quadric engine. 0 uses all CPU cores, 1 runs in Blender",
+        default=0,
+        min=0,
+        max=64
+    )
     texture_path: StringProperty(
         name="Texture Path",
         description="Path to the folder containing textures",
         default="",
         subtype='DIR_PATH'
     )
+    cleanup_enabled : BoolProperty(
+        name="Clean Up LOD00 Meshes",
+        description="Merge duplicate vertices and remove degenerate faces and loose geometry once per LOD00 mesh before decimating",
+        default=True
+    )
+    cleanup_merge_distance : FloatProperty(
+        name="Merge Distance",
+        description="Vertices closer than this distance are merged by the cleanup pre-pass",
+        default=0.0001,
+        min=0.0,
+        max=1.0,
+        precision=5,
+        unit='LENGTH'
+    )
+    cull_hidden : BoolProperty(
+        name="Remove Hidden Geometry",
+        description="Delete faces that are never visible from outside of the asset (interiors, backfaces against walls) from the far LODs",
+        default=False
+    )
+    cull_min_lod : IntProperty(
+        name="From LOD",
+        description="First LOD level hidden geometry is removed from",
+        default=2,
+        min=1,
+        max=3
+    )
+    cull_samples : IntProperty(
+        name="Directions",
+        description="Number of directions around the asset rays are cast from",
+        default=64,
+        min=8,
+        max=1024
+    )
+    cull_resolution : IntProperty(
+        name="Rays per Direction",
+        description="Resolution of the grid of rays cast from each direction. The cost grows with the square of it",
+        default=32,
+        min=8,
+        max=512
+    )
+    streaming_enabled : BoolProperty(
+        name="Streaming Generation",
+        description="Generate and apply LODs in chunks of objects, freeing intermediate meshes after each chunk. Keeps memory bounded on very large scenes, modifiers are applied",
+        default=False
+    )
+    stream_chunk_size : IntProperty(
+        name="Chunk Size",
+        description="Maximum number of objects processed per chunk",
+        default=256,
+        min=1
+    )
+    stream_memory_limit : IntProperty(
+        name="Memory Ceiling (MB)",
+        description="The chunk size is reduced while Blender uses more memory than this. Set to 0 to disable",
+        default=0,
+        min=0
+    )
+    bake_normals : BoolProperty(
+        name="Bake Normal Maps",
+        description="Bake the normals of the LOD00 objects onto the generated LODs that keep their materials (LOD01). One normal map per material and LOD level, shared by its objects: they must not overlap in UV space. LODs baked to vertex colors (LOD02/03) are skipped on purpose: they have no material, and one shared normal map over all their objects' overlapping UVs can't be baked",
+        default=False
+    )
+    bake_normal_size : EnumProperty(
+        name="Normal Map Size",
+        items=(
+            ('512', "512", ""),
+            ('1024', "1024", ""),
+            ('2048', "2048", ""),
+            ('4096', "4096", ""),
+        ),
+        default='1024'
+    )
+    bake_cage_extrusion : FloatProperty(
+        name="Cage Extrusion",
+        description="Distance the LOD surface is inflated by before casting rays towards the LOD00 surface",
+        default=0.05,
+        min=0.0,
+        max=10.0,
+        precision=3,
+        unit='LENGTH'
+    )
+    bake_max_ray_distance : FloatProperty(
+        name="Max Ray Distance",
+        description="Maximum ray distance from the LOD surface to the LOD00 surface. Set to 0 to disable the limit",
+        default=0.1,
+        min=0.0,
+        max=10.0,
+        precision=3,
+        unit='LENGTH'
+    )
+    cache_enabled : BoolProperty(
+        name="Mesh Cache",
+        description="Reuse generated LOD meshes from an on-disk cache shared across sessions and files",
+        default=False
+    )
+    cache_path : StringProperty(
+        name="Cache Path",
+        description="Folder of the LOD mesh cache. Leave empty to use the system temporary folder",
+        default="",
+        subtype='DIR_PATH'
+    )
+    cache_size_limit : IntProperty(
+        name="Cache Size Limit (MB)",
+        description="Least recently used cache entries are removed once the cache grows past this size",
+        default=2048,
+        min=16
+    )
+    budget_triangle_ratio : FloatProperty(
+        name="Max Triangle Ratio",
+        description="Maximum triangle count of each LOD relative to the previous LOD",
+        default=0.5,
+        min=0.0,
+        max=1.0,
+        subtype='FACTOR'
+    )
+    budget_max_draw_calls : IntProperty(
+        name="Max Draw Calls",
+        description="Maximum draw calls (mesh and material pairs) per LOD. Set to 0 to disable",
+        default=0,
+        min=0
+    )
+    budget_max_texture_mb : FloatProperty(
+        name="Max Texture Memory (MB)",
+        description="Maximum texture memory per LOD. Set to 0 to disable",
+        default=0.0,
+        min=0.0
+    )
+    budget_report : StringProperty(
+        description="Last LOD budget report",
+        default="",
+        options={'HIDDEN'}
+    )
+    use_background_workers : BoolProperty(
+        name="Background Workers",
+        description="Generate the assets in parallel background Blender processes and import the results. Each worker loads a copy of the file",
+        default=False
+    )
+    max_workers : IntProperty(
+        name="Max Workers",
+        description="Maximum number of background Blender processes running at the same time",
+        default=2,
+        min=1,
+        max=64
+    )
+    undo_light : BoolProperty(
+        name="Undo-Light Generation",
+        description="Skip the undo step when generating LODs and record a rollback manifest instead. Faster and lighter on memory for large scenes, use Revert Last Generation to roll back",
+        default=False
+    )
+    generation_manifest : StringProperty(
+        description="Rollback manifest of the last undo-light generation",
+        default="",
+        options={'HIDDEN'}
+    )
+
+    def active_asset(self):
+        if 0 <= self.assets_index < len(self.assets):
+            return self.assets[self.assets_index]
+        return None
 
 classes = (
     LODIFY_props_list,
+    LODIFY_props_asset,
     LODIFY_props_scn,
 )
 
@@ -0,0 +1,391 @@
+# quadric.py
+#
+# Edge-collapse decimation with quadric error metrics (Garland & Heckbert), extended to UV and color
+# attributes. Only NumPy is imported, so the kernel runs in worker processes and outside of Blender.
+# - Polygons are fan-triangulated and every corner is mapped to a wedge: a unique combination of
+#   vertex, material, UVs and face-corner colors. Vertices with more than one wedge are on a seam.
+# - Every wedge accumulates the area-weighted quadrics of its triangles in the (3 + attributes)
+#   dimensional space, so drifting away from the UVs/colors costs like drifting away from the surface.
+# - Half-edge collapses only: a vertex is merged into a neighbour and takes its position and attributes.
+#   Seam, boundary and non-manifold vertices are locked: they can be collapsed into, never removed.
+# - Half-edge twins come from array sorts and only serve the locking. The collapse loop keeps its own
+#   connectivity (triangles per vertex) in Python lists and sets, not in the half-edge arrays: every
+#   collapse edits a handful of entries, which Python containers do faster than NumPy calls.
+#   Collapses come from a heap invalidated lazily through per-vertex versions. Every collapse is
+#   checked for the link condition, flipped triangles and slivers.
+# - The collapse loop is sequential Python: about 3,000 to 5,000 collapses per second per worker, so
+#   taking a 250k triangle mesh to 10% costs ~35s. Workers run objects in parallel, not one object faster.
+# Arrays use the layout of mesh_cache.read_mesh_arrays.
+#
+# Run this file directly for a benchmark on a generated mesh.
+
+import math
+import heapq
+import numpy as np
+
+QUADRIC_VERSION = 2
+
+# Limits of a collapse on the triangles it moves: cosine of the largest turn of their normal, cosine of
+# the largest angle to their input normal, and the lowest quality (1 for an equilateral triangle)
+MAX_TURN = 0.25
+MAX_DRIFT = 0.5
+MIN_QUALITY = 0.2
+
+# Triangles per batch when accumulating the quadrics, bounds the (batch, n, n) temporaries
+QUADRIC_BATCH = 65536
+
+
+def triangulate(loop_start, loop_total):
+    # Fan triangulation, returns the loops of the triangle corners and the polygon of every triangle
+    tri_count = np.maximum(loop_total - 2, 0)
+    polygon = np.repeat(np.arange(len(loop_start)), tri_count)
+    fan = np.arange(len(polygon)) - np.repeat(np.cumsum(tri_count) - tri_count, tri_count)
+    start = loop_start[polygon]
+    return np.stack((start, start + fan + 1, start + fan + 2), axis=1), polygon
+
+
+def loop_attributes(arrays, color_domains, loop_vert, uv_scale, color_scale):
+    # Scaled UVs and colors of every loop, as extra quadric dimensions
+    columns = []
+    i = 0
+    while f"uv_{i}" in arrays:
+        columns.append(np.asarray(arrays[f"uv_{i}"], dtype=np.float64) * uv_scale)
+        i += 1
+    for i, domain in enumerate(color_domains):
+        color = np.asarray(arrays[f"color_{i}"], dtype=np.float64)
+        columns.append((color[loop_vert] if domain == 'POINT' else color) * color_scale)
+    if not columns:
+        return np.empty((len(loop_vert), 0))
+    return np.concatenate(columns, axis=1)
+
+
+def half_edges(tri_vert, vertex_count):
+    # Half-edge h = 3 * triangle + corner goes from its corner to the next one.
+    # Returns the origin, target and twin of every half-edge, the twin is -1 on boundaries and on
+    # non-manifold or inconsistently oriented edges
+    origin = tri_vert.ravel()
+    target = np.roll(tri_vert, -1, axis=1).ravel()
+    key = np.minimum(origin, target) * vertex_count + np.maximum(origin, target)
+    order = np.argsort(key, kind='stable')
+    sorted_key = key[order]
+    starts = np.flatnonzero(np.r_[True, sorted_key[1:] != sorted_key[:-1]])
+    counts = np.diff(np.r_[starts, len(key)])
+
+    twin = np.full(len(key), -1, dtype=np.int64)
+    pairs = starts[counts == 2]
+    a, b = order[pairs], order[pairs + 1]
+    opposite = origin[a] == target[b]
+    twin[a[opposite]] = b[opposite]
+    twin[b[opposite]] = a[opposite]
+    return origin, target, twin
+
+
+def cross(a, b):
+    # np.cross has a large overhead on the few rows checked per collapse
+    return np.stack((a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1],
+                     a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2],
+                     a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]), axis=1)
+
+
+def triangle_quadrics(points):
+    # points: (triangles, 3, n). Returns the area-weighted A (triangles, n, n), b (triangles, n)
+    # and c (triangles) of the n-dimensional quadric Q(x) = x.A.x + 2 b.x + c
+    p, q, r = points[:, 0], points[:, 1], points[:, 2]
+    area = 0.5 * np.linalg.norm(cross(q[:, :3] - p[:, :3], r[:, :3] - p[:, :3]), axis=1)
+
+    e1 = q - p
+    e1 /= np.maximum(np.linalg.norm(e1, axis=1, keepdims=True), 1e-30)
+    e2 = r - p
+    e2 -= (e2 * e1).sum(axis=1, keepdims=True) * e1
+    e2 /= np.maximum(np.linalg.norm(e2, axis=1, keepdims=True), 1e-30)
+
+    n = points.shape[2]
+    A = np.eye(n) - e1[:, :, None] * e1[:, None, :] - e2[:, :, None] * e2[:, None, :]
+    pe1 = (p * e1).sum(axis=1)
+    pe2 = (p * e2).sum(axis=1)
+    b = pe1[:, None] * e1 + pe2[:, None] * e2 - p
+    c = (p * p).sum(axis=1) - pe1 * pe1 - pe2 * pe2
+    return A * area[:, None, None], b * area[:, None], c * area
+
+
+def wedge_quadrics(wedge_point, tri_wedge):
+    n = wedge_point.shape[1]
+    Q = np.zeros((len(wedge_point), n, n))
+    B = np.zeros((len(wedge_point), n))
+    C = np.zeros(len(wedge_point))
+    for start in range(0, len(tri_wedge), QUADRIC_BATCH):
+        wedges = tri_wedge[start:start + QUADRIC_BATCH]
+        A, b, c = triangle_quadrics(wedge_point[wedges])
+        for corner in range(3):
+            np.add.at(Q, wedges[:, corner], A)
+            np.add.at(B, wedges[:, corner], b)
+            np.add.at(C, wedges[:, corner], c)
+    return Q, B, C
+
+
+def collapse_costs(Q, B, C, P, source, target):
+    # Error of merging wedge source into wedge target, evaluated at the target: (Qs + Qt)(p_target)
+    costs = np.empty(len(source))
+    for start in range(0, len(source), QUADRIC_BATCH):
+        s = source[start:start + QUADRIC_BATCH]
+        t = target[start:start + QUADRIC_BATCH]
+        x = P[t]
+        costs[start:start + QUADRIC_BATCH] = (
+            np.einsum('ij,ijk,ik->i', x, Q[s] + Q[t], x) + 2.0 * ((B[s] + B[t]) * x).sum(axis=1) + C[s] + C[t]
+        )
+    return np.maximum(costs, 0.0)
+
+
+def decimate(arrays, color_domains, ratio, max_error=np.inf, uv_weight=1.0, color_weight=1.0):
+    # Simplifies the mesh to ratio of its triangles, or until the cheapest collapse costs more than
+    # max_error. color_domains lists the domain ('POINT' or 'CORNER') of every color_i array.
+    # Returns triangulated arrays in the same layout.
+    co = np.asarray(arrays["co"], dtype=np.float64).reshape(-1, 3)
+    loop_vert = np.asarray(arrays["loop_vert"], dtype=np.int64)
+    loop_start = np.asarray(arrays["loop_start"], dtype=np.int64)
+    loop_total = np.asarray(arrays["loop_total"], dtype=np.int64)
+    material_index = np.asarray(arrays.get("material_index", np.zeros(len(loop_start))), dtype=np.int64)
+    use_smooth = np.asarray(arrays.get("use_smooth", np.zeros(len(loop_start))), dtype=bool)
+
+    corners, tri_polygon = triangulate(loop_start, loop_total)
+    tri_vert = loop_vert[corners]
+    valid = ((tri_vert[:, 0] != tri_vert[:, 1]) & (tri_vert[:, 1] != tri_vert[:, 2])
+             & (tri_vert[:, 2] != tri_vert[:, 0]))
+    corners, tri_polygon, tri_vert = corners[valid], tri_polygon[valid], tri_vert[valid]
+
+    # Attributes are scaled to the size of the mesh, a UV or color offset of 1 costs like an offset
+    # of the whole bounding box diagonal
+    size = float(np.linalg.norm(co.max(axis=0) - co.min(axis=0))) if len(co) else 1.0
+    attributes = loop_attributes(arrays, color_domains, loop_vert, uv_weight * size, color_weight * size)
+
+    # Wedges
+    loop_polygon = np.repeat(np.arange(len(loop_start)), loop_total)
+    keys = np.column_stack((loop_vert, material_index[loop_polygon], attributes))
+    _, wedge_loop, loop_wedge = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    loop_wedge = loop_wedge.ravel()
+    wedge_vert = loop_vert[wedge_loop]
+    wedge_point = np.column_stack((co[wedge_vert], attributes[wedge_loop]))
+    tri_wedge = loop_wedge[corners]
+
+    # Locked vertices: seams, boundaries and non-manifold edges
+    origin, target, twin = half_edges(tri_vert, len(co))
+    locked = np.bincount(wedge_vert[np.unique(tri_wedge)], minlength=len(co)) > 1
+    locked[origin[twin < 0]] = True
+    locked[target[twin < 0]] = True
+
+    Q, B, C = wedge_quadrics(wedge_point, tri_wedge)
+
+    # Every half-edge gives both collapse directions, the source must be unlocked
+    next_wedge = np.roll(tri_wedge, -1, axis=1).ravel()
+    source = np.r_[origin, target]
+    destination = np.r_[target, origin]
+    source_wedge = np.r_[tri_wedge.ravel(), next_wedge]
+    destination_wedge = np.r_[next_wedge, tri_wedge.ravel()]
+    keep = ~locked[source]
+    _, first = np.unique(source[keep] * len(co) + destination[keep], return_index=True)
+    pick = np.flatnonzero(keep)[first]
+    costs = collapse_costs(Q, B, C, wedge_point, source_wedge[pick], destination_wedge[pick])
+    heap = [(cost, u, v, 0, 0) for cost, u, v in zip(costs.tolist(), source[pick].tolist(), destination[pick].tolist())]
+    heapq.heapify(heap)
+
+    # Dynamic connectivity, plain Python containers for the per-collapse updates
+    tris = tri_vert.tolist()
+    tri_wedges = tri_wedge.tolist()
+    tri_alive = np.ones(len(tris), dtype=bool)
+    adjacent = [set() for _ in range(len(co))]
+    for t, tri in enumerate(tris):
+        for x in tri:
+            adjacent[x].add(t)
+    vertex_wedge = np.zeros(len(co), dtype=np.int64)
+    vertex_wedge[tri_vert.ravel()] = tri_wedge.ravel()
+    vertex_alive = np.ones(len(co), dtype=bool)
+    version = [0] * len(co)
+    locked = locked.tolist()
+    points = co.tolist()
+    tri_normal = cross(co[tri_vert[:, 1]] - co[tri_vert[:, 0]], co[tri_vert[:, 2]] - co[tri_vert[:, 0]])
+    tri_normal = (tri_normal / np.maximum(np.linalg.norm(tri_normal, axis=1, keepdims=True), 1e-30)).tolist()
+
+    def corner_wedge(t, x):
+        return tri_wedges[t][tris[t].index(x)]
+
+    def neighbours(x):
+        return {y for t in adjacent[x] for y in tris[t]} - {x}
+
+    def degrades(t, u, v):
+        # Whether moving corner u of triangle t onto v flips it: turns its normal by more than ~75 degrees,
+        # or by more than 60 degrees from its input normal so repeated moves can't fold it over either.
+        # Slivers are rejected too, their normals are noise. Plain Python, NumPy calls cost more than the
+        # arithmetic on the few triangles around u.
+        tri = tris[t]
+        (ax, ay, az), (bx, by, bz), (cx, cy, cz) = (points[x] for x in tri)
+        n1 = ((by - ay) * (cz - az) - (bz - az) * (cy - ay),
+              (bz - az) * (cx - ax) - (bx - ax) * (cz - az),
+              (bx - ax) * (cy - ay) - (by - ay) * (cx - ax))
+        (ax, ay, az), (bx, by, bz), (cx, cy, cz) = (points[v] if x == u else points[x] for x in tri)
+        n2 = ((by - ay) * (cz - az) - (bz - az) * (cy - ay),
+              (bz - az) * (cx - ax) - (bx - ax) * (cz - az),
+              (bx - ax) * (cy - ay) - (by - ay) * (cx - ax))
+        length1 = n1[0] * n1[0] + n1[1] * n1[1] + n1[2] * n1[2]
+        length2 = math.sqrt(n2[0] * n2[0] + n2[1] * n2[1] + n2[2] * n2[2])
+        if length1 > 0.0 and n1[0] * n2[0] + n1[1] * n2[1] + n1[2] * n2[2] < MAX_TURN * math.sqrt(length1) * length2:
+            return True
+        ox, oy, oz = tri_normal[t]
+        if ox * n2[0] + oy * n2[1] + oz * n2[2] < MAX_DRIFT * length2:
+            return True
+        # Quality 4 * sqrt(3) * area / sum of the squared edges, 1 for an equilateral triangle
+        edges = ((bx - ax) ** 2 + (by - ay) ** 2 + (bz - az) ** 2 + (cx - bx) ** 2 + (cy - by) ** 2
+                 + (cz - bz) ** 2 + (ax - cx) ** 2 + (ay - cy) ** 2 + (az - cz) ** 2)
+        return 2.0 * math.sqrt(3.0) * length2 < MIN_QUALITY * edges
+
+    def push(candidates):
+        # Candidate collapses (a, b, triangle they share) of a into b, with their costs computed at once
+        a, b, t = zip(*candidates)
+        wa = np.array([corner_wedge(*pair) for pair in zip(t, a)])
+        wb = np.array([corner_wedge(*pair) for pair in zip(t, b)])
+        for cost, x, y in zip(collapse_costs(Q, B, C, wedge_point, wa, wb).tolist(), a, b):
+            heapq.heappush(heap, (cost, x, y, version[x], version[y]))
+
+    def collapse(u, v):
+        # Merges u into v, returns the number of removed triangles or 0 if the collapse isn't allowed
+        shared = [t for t in adjacent[u] if v in tris[t]]
+        if not shared:
+            return 0
+        # All the triangles around u must end up on the same side of a seam at v
+        w = corner_wedge(shared[0], v)
+        if any(corner_wedge(t, v) != w for t in shared[1:]):
+            return 0
+        # Link condition, the only common neighbours are the opposite corners of the shared triangles
+        opposite = {x for t in shared for x in tris[t]} - {u, v}
+        if neighbours(u) & neighbours(v) != opposite:
+            return 0
+
+        moved = [t for t in adjacent[u] if t not in shared]
+        if any(degrades(t, u, v) for t in moved):
+            return 0
+
+        for t in shared:
+            tri_alive[t] = False
+            for x in tris[t]:
+                adjacent[x].discard(t)
+        for t in moved:
+            i = tris[t].index(u)
+            tris[t][i] = v
+            tri_wedges[t][i] = w
+            adjacent[v].add(t)
+        adjacent[u] = set()
+        vertex_alive[u] = False
+
+        wu = vertex_wedge[u]
+        Q[w] += Q[wu]
+        B[w] += B[wu]
+        C[w] += C[wu]
+        return len(shared)
+
+    live = len(tris)
+    target_count = max(int(np.ceil(live * ratio)), 1)
+    while heap and live > target_count:
+        cost, u, v, version_u, version_v = heapq.heappop(heap)
+        if not vertex_alive[u] or not vertex_alive[v] or version[u] != version_u or version[v] != version_v:
+            continue
+        if cost > max_error:
+            break
+        removed = collapse(u, v)
+        if not removed:
+            continue
+        live -= removed
+
+        # The quadric and the triangles of v changed, refresh the collapses of its edges
+        version[v] += 1
+        seen = set()
+        candidates = []
+        for t in adjacent[v]:
+            for n in tris[t]:
+                if n == v or n in seen:
+                    continue
+                seen.add(n)
+                if not locked[n]:
+                    candidates.append((n, v, t))
+                if not locked[v]:
+                    candidates.append((v, n, t))
+        if candidates:
+            push(candidates)
+
+    # Compact the surviving triangles and the vertices they use
+    alive = np.flatnonzero(tri_alive)
+    tri_vert = np.array(tris, dtype=np.int64).reshape(-1, 3)[alive]
+    tri_wedge = np.array(tri_wedges, dtype=np.int64).reshape(-1, 3)[alive]
+    used, remapped = np.unique(tri_vert, return_inverse=True)
+    corner_loop = wedge_loop[tri_wedge.ravel()]
+
+    result = {
+        "co": np.asarray(co[used], dtype=np.float32),
+        "loop_vert": remapped.ravel().astype(np.int32),
+        "loop_start": np.arange(0, len(alive) * 3, 3, dtype=np.int32),
+        "loop_total": np.full(len(alive), 3, dtype=np.int32),
+        "material_index": material_index[tri_polygon[alive]].astype(np.int32),
+        "use_smooth": use_smooth[tri_polygon[alive]],
+    }
+    i = 0
+    while f"uv_{i}" in arrays:
+        result[f"uv_{i}"] = np.asarray(arrays[f"uv_{i}"], dtype=np.float32)[corner_loop]
+        i += 1
+    for i, domain in enumerate(color_domains):
+        color = np.asarray(arrays[f"color_{i}"], dtype=np.float32)
+        result[f"color_{i}"] = color[used] if domain == 'POINT' else color[corner_loop]
+    return result
+
+
+def torus(rings, segments, noise=0.0, seed=0):
+    # Quad torus with a UV seam along both wrap-arounds and a point color attribute, for the benchmark
+    rng = np.random.default_rng(seed)
+    i, j = np.meshgrid(np.arange(rings), np.arange(segments), indexing='ij')
+    theta = 2.0 * np.pi * i / rings
+    phi = 2.0 * np.pi * j / segments
+    radius = 1.0 + 0.3 * np.cos(phi) + noise * rng.standard_normal(phi.shape)
+    co = np.stack((radius * np.cos(theta), radius * np.sin(theta), 0.3 * np.sin(phi)), axis=-1).reshape(-1, 3)
+
+    a = (i * segments + j).ravel()
+    b = (((i + 1) % rings) * segments + j).ravel()
+    c = (((i + 1) % rings) * segments + (j + 1) % segments).ravel()
+    d = (i * segments + (j + 1) % segments).ravel()
+    loop_vert = np.stack((a, b, c, d), axis=1).ravel()
+
+    # UVs of the quad corners, the last row and column map to 1.0 instead of wrapping to 0.0
+    u = np.stack((i, i + 1, i + 1, i), axis=-1).reshape(-1) / rings
+    v = np.stack((j, j, j + 1, j + 1), axis=-1).reshape(-1) / segments
+    color = np.column_stack((0.5 + 0.5 * co / 1.3, np.ones(len(co))))
+
+    quads = rings * segments
+    return {
+        "co": co.astype(np.float32),
+        "loop_vert": loop_vert.astype(np.int32),
+        "loop_start": np.arange(0, quads * 4, 4, dtype=np.int32),
+        "loop_total": np.full(quads, 4, dtype=np.int32),
+        "material_index": np.zeros(quads, dtype=np.int32),
+        "use_smooth": np.ones(quads, dtype=bool),
+        "uv_0": np.column_stack((u, v)).astype(np.float32),
+        "color_0": color.astype(np.float32),
+    }
+
+
+def benchmark():
+    import time
+
+    for rings, segments in ((64, 32), (256, 128), (512, 256)):
+        arrays = torus(rings, segments, noise=0.002)
+        triangles = len(arrays["loop_start"]) * 2
+        for ratio in (0.5, 0.1):
+            start = time.perf_counter()
+            result = decimate(arrays, ['POINT'], ratio)
+            elapsed = time.perf_counter() - start
+
+            tri_vert = result["loop_vert"].reshape(-1, 3)
+            assert len(tri_vert) <= np.ceil(triangles * ratio) + 2
+            assert not np.any((tri_vert[:, 0] == tri_vert[:, 1]) | (tri_vert[:, 1] == tri_vert[:, 2]) | (tri_vert[:, 2] == tri_vert[:, 0]))
+            assert tri_vert.max() < len(result["co"]) and len(result["uv_0"]) == len(result["loop_vert"])
+            print(f"{triangles:>8} -> {len(tri_vert):>7} triangles (ratio {ratio}): {elapsed:.2f}s, "
+                  f"{(triangles - len(tri_vert)) / elapsed / 2:,.0f} collapses/s")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,251 @@
+# scheduler.py
+#
+# Multi-asset work queue for LOD generation.
+# Every collection ending with _LOD00 that isn't nested in another _LOD00 collection is an asset
+# with its own lod_list. Assets are ordered largest first so the long ones don't end up last, and
+# can be generated in parallel background Blender processes whose results are appended back.
+
+import bpy
+import sys
+import json
+import subprocess
+from .budget import material_images
+from .manifest import LOD_ITEM_FLAGS
+from .normal_bake import SOURCE_PROPERTY, HASH_PROPERTY
+
+# Default MSFS minSize (percent of the screen height) for LOD00 to LOD03
+LOD_MIN_SIZES = (70.0, 50.0, 30.0, 10.0)
+
+
+def find_base_collections():
+    roots = []
+
+    def walk(collection):
+        for child in collection.children:
+            if child.name.endswith("_LOD00"):
+                if child not in roots:
+                    roots.append(child)
+            else:
+                walk(child)
+
+    for scene in bpy.data.scenes:
+        walk(scene.collection)
+    return roots
+
+
+def migrate_legacy_list(scn):
+    # Files saved before assets existed keep a single lod_list on the scene, starting with the _LOD00 collection
+    legacy = scn.lod.lod_list
+    base = next((item.ui_lod for item in legacy if item.ui_lod and item.ui_lod.name.endswith("_LOD00")), None)
+    if base is None:
+        return
+    name = base.name[:-6]  # Remove "_LOD00" from the end
+    asset = scn.lod.assets.get(name)
+    if asset is None:
+        asset = scn.lod.assets.add()
+        asset.name = name
+    asset.base = base
+    asset.lod_list.clear()
+    for old in legacy:
+        item = asset.lod_list.add()
+        item.ui_lod = old.ui_lod
+        for flag in LOD_ITEM_FLAGS:
+            setattr(item, flag, getattr(old, flag))
+    asset.lod_list_index = min(scn.lod.lod_list_index, max(len(asset.lod_list) - 1, 0))
+    legacy.clear()
+
+
+def sync_assets(scn):
+    # Adds an asset for every new _LOD00 root and drops the assets whose root is gone
+    migrate_legacy_list(scn)
+    roots = find_base_collections()
+    for base in roots:
+        name = base.name[:-6]  # Remove "_LOD00" from the end
+        asset = scn.lod.assets.get(name)
+        if asset is None:
+            asset = scn.lod.assets.add()
+            asset.name = name
+        asset.base = base
+
+    for i in reversed(range(len(scn.lod.assets))):
+        if scn.lod.assets[i].base not in roots:
+            scn.lod.assets.remove(i)
+    scn.lod.assets_index = min(scn.lod.assets_index, max(len(scn.lod.assets) - 1, 0))
+    return list(scn.lod.assets)
+
+
+def fill_lod_list(asset, lod_collections):
+    # lod_collections maps LOD levels to collections
+    asset.lod_list.clear()
+    for level, collection in sorted(lod_collections.items()):
+        item = asset.lod_list.add()
+        item.ui_lod = collection
+        item.ui_min_size = LOD_MIN_SIZES[min(level, len(LOD_MIN_SIZES) - 1)]
+        if level == 0:
+            item.ui_rdf = True
+            item.ui_rdv = True
+        elif level == 3:
+            item.ui_dsp = True
+
+
+def asset_cost(asset):
+    # Polygon count of the base collection, used to balance the queue
+    meshes = {obj.data for obj in asset.base.all_objects if obj.type == 'MESH'}
+    instances = sum(1 for obj in asset.base.all_objects if obj.type == 'MESH')
+    return sum(len(mesh.polygons) for mesh in meshes) + instances
+
+
+def schedule(assets):
+    return sorted((asset for asset in assets if asset.base), key=asset_cost, reverse=True)
+
+
+def lod_parent(scn, base):
+    # LOD collections are linked next to their base collection
+    if base.name in scn.collection.children:
+        return scn.collection
+    for collection in bpy.data.collections:
+        if base.name in collection.children:
+            return collection
+    return scn.collection
+
+
+def remove_collection_tree(collection):
+    collections = [collection] + list(collection.children_recursive)
+    objects = set(collection.all_objects)
+    meshes = {obj.data for obj in objects if obj.type == 'MESH' and obj.data}
+    bpy.data.batch_remove(list(objects) + collections)
+    bpy.data.batch_remove([mesh for mesh in meshes if mesh.users == 0])
+
+
+def write_lod_dependencies(asset, path, material_names, image_names):
+    # Names of the datablocks of the original file (material_names and image_names) the generated LODs use,
+    # so they get appended back and remapped to the local ones:
+    # - "materials", "images": unchanged by the generation, deduplicated
+    # - "generated_materials", "generated_images": normal-mapped LOD materials and their maps, rebaked by
+    #   the generation, they replace the stale local ones
+    # - "objects": parents of the LOD objects, the copies keep pointing at the LOD00 objects
+    lod_objects = set()
+    for item in list(asset.lod_list)[1:]:
+        if item.ui_lod:
+            lod_objects.update(item.ui_lod.all_objects)
+    materials = set()
+    parents = set()
+    for obj in lod_objects:
+        materials.update(slot.material for slot in obj.material_slots if slot.material)
+        parent = obj.parent
+        while parent and parent not in lod_objects:
+            parents.add(parent)
+            parent = parent.parent
+    images = set()
+    for material in materials:
+        images.update(material_images(material))
+
+    generated_materials = {m for m in materials if m.get(SOURCE_PROPERTY)}
+    # Normal maps are only referenced through the MSFS texture properties, found by name without the exporter
+    images.update(filter(None, (bpy.data.images.get(f"{m.name}_normal") for m in generated_materials)))
+    generated_images = {i for i in images if i.get(HASH_PROPERTY)}
+    with open(path, "w") as f:
+        json.dump({
+            "materials": sorted(m.name for m in materials - generated_materials if m.name in material_names),
+            "images": sorted(i.name for i in images - generated_images if i.name in image_names),
+            "generated_materials": sorted(m.name for m in generated_materials if m.name in material_names),
+            "generated_images": sorted(i.name for i in generated_images if i.name in image_names),
+            "objects": sorted(obj.name for obj in parents),
+        }, f)
+
+
+def launch_worker(blend_path, scene_name, asset_name, output_path, log_path):
+    script = (
+        "import bpy, sys, traceback\n"
+        f"scene = bpy.data.scenes[{scene_name!r}]\n"
+        "materials = set(bpy.data.materials.keys())\n"
+        "images = set(bpy.data.images.keys())\n"
+        "try:\n"
+        "    with bpy.context.temp_override(scene=scene, view_layer=scene.view_layers[0]):\n"
+        f"        result = bpy.ops.lodify.generate_lod_decimate(asset_name={asset_name!r})\n"
+        "    if 'FINISHED' not in result:\n"
+        "        sys.exit(1)\n"
+        f"    bpy.ops.wm.save_as_mainfile(filepath={output_path!r}, copy=True)\n"
+        "    import importlib\n"
+        f"    scheduler = importlib.import_module({__package__!r} + '.scheduler')\n"
+        f"    scheduler.write_lod_dependencies(scene.lod.assets[{asset_name!r}], {output_path + '.json'!r}, materials, images)\n"
+        "except Exception:\n"
+        "    traceback.print_exc()\n"
+        "    sys.exit(1)\n"
+    )
+    command = [
+        bpy.app.binary_path, "--background", "-noaudio", blend_path,
+        "--addons", __package__,
+        "--python-exit-code", "1",
+        "--python-expr", script,
+    ]
+    log = open(log_path, "w")
+    try:
+        creation_flags = subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
+        return subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, creationflags=creation_flags)
+    finally:
+        log.close()
+
+
+def import_worker_result(scn, asset, path):
+    # Appends the LOD collections generated by a worker, replacing the current ones
+    base_name = asset.base.name[:-5]  # Remove "LOD00" from the end
+    lod_names = [f"{base_name}LOD{i:02d}" for i in range(1, 4)]
+    for name in lod_names:
+        existing = bpy.data.collections.get(name)
+        if existing:
+            remove_collection_tree(existing)
+
+    # The worker file is a copy of this one, so the original datablocks the LODs use are already here.
+    # Only those are appended explicitly, to know which local datablock each appended duplicate stands for.
+    dependencies = {"materials": [], "images": [], "generated_materials": [], "generated_images": [], "objects": []}
+    try:
+        with open(path + ".json") as f:
+            dependencies.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    kinds = {"materials": "materials", "images": "images", "generated_materials": "materials",
+             "generated_images": "images", "objects": "objects"}
+    with bpy.data.libraries.load(path, link=False) as (data_from, data_to):
+        data_to.collections = [name for name in lod_names if name in data_from.collections]
+        requested_collections = list(data_to.collections)
+        requested = {key: [name for name in dependencies[key]
+                           if name in getattr(data_from, kind) and name in getattr(bpy.data, kind)]
+                     for key, kind in kinds.items()}
+        data_to.materials = requested["materials"] + requested["generated_materials"]
+        data_to.images = requested["images"] + requested["generated_images"]
+        data_to.objects = list(requested["objects"])
+
+    stale = []
+    renames = []
+    for kind, generated in (("materials", "generated_materials"), ("images", "generated_images"), ("objects", None)):
+        data = getattr(bpy.data, kind)
+        replaced = set(requested[generated]) if generated else set()
+        names = requested[kind] + (requested[generated] if generated else [])
+        for name, datablock in zip(names, getattr(data_to, kind)):
+            if not datablock or datablock.name == name or name not in data:
+                continue
+            if name in replaced:
+                # Rebaked by the worker, the local one is stale
+                data[name].user_remap(datablock)
+                stale.append(data[name])
+                renames.append((datablock, name))
+            else:
+                datablock.user_remap(data[name])
+                stale.append(datablock)
+    # Duplicated parents brought their own meshes and materials along
+    meshes = {obj.data for obj in stale if isinstance(obj, bpy.types.Object) and isinstance(obj.data, bpy.types.Mesh)}
+    materials = {material for mesh in meshes for material in mesh.materials if material}
+    bpy.data.batch_remove(stale)
+    bpy.data.batch_remove([mesh for mesh in meshes if mesh.users == 0])
+    bpy.data.batch_remove([material for material in materials if material.users == 0])
+    for datablock, name in renames:
+        datablock.name = name
+
+    parent = lod_parent(scn, asset.base)
+    lod_collections = {0: asset.base}
+    for name, collection in zip(requested_collections, data_to.collections):
+        if collection:
+            parent.children.link(collection)
+            lod_collections[lod_names.index(name) + 1] = collection
+    fill_lod_list(asset, lod_collections)
@@ -0,0 +1,90 @@
+# streaming.py
+#
+# Helpers for the memory-bounded streaming generation mode.
+# Objects are processed in chunks through the full copy -> convert -> bake -> decimate -> apply
+# pipeline, and the temporary datablocks of a chunk are freed before the next one starts.
+# That includes the cleaned working copies of the LOD00 meshes, which are cleaned again for each LOD
+# level instead of staying alive for the whole generation.
+# The chunk size adapts to the measured memory usage of the Blender process.
+
+import bpy
+import os
+import sys
+import ctypes
+import logging
+
+
+def process_memory_mb():
+    # Current resident memory of this process in MB, None when it can't be measured
+    try:
+        if sys.platform == 'win32':
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", ctypes.c_ulong),
+                    ("PageFaultCount", ctypes.c_ulong),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return None
+            return counters.WorkingSetSize / (1024 * 1024)
+        if os.path.exists("/proc/self/statm"):
+            with open("/proc/self/statm") as f:
+                resident_pages = int(f.read().split()[1])
+            return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        import resource
+        # Peak usage only on macOS, in bytes
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ChunkSizer:
+    # Halves the chunk size while the process is above the memory ceiling, grows it back below 75% of it
+
+    def __init__(self, chunk_size, memory_limit_mb):
+        self.max_size = max(1, chunk_size)
+        self.size = self.max_size
+        self.memory_limit_mb = memory_limit_mb
+
+    def update(self):
+        if not self.memory_limit_mb:
+            return
+        used = process_memory_mb()
+        if used is None:
+            return
+        if used > self.memory_limit_mb:
+            self.size = max(1, self.size // 2)
+            logging.info(f"Memory at {used:.0f} MB, LOD chunk size reduced to {self.size}")
+        elif used < self.memory_limit_mb * 0.75 and self.size < self.max_size:
+            self.size = min(self.max_size, self.size + max(1, self.size // 2))
+
+
+def apply_modifiers(objects, depsgraph):
+    # Bakes the modifier stack into a new mesh and frees the unapplied copy
+    for obj in objects:
+        if obj.type != 'MESH' or not obj.modifiers:
+            continue
+        old_mesh = obj.data
+        name = old_mesh.name
+        new_mesh = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph))
+        obj.modifiers.clear()
+        obj.data = new_mesh
+        if old_mesh.users == 0:
+            bpy.data.meshes.remove(old_mesh)
+        new_mesh.name = name
+
+
+def free_unused(datablocks):
+    unused = [db for db in datablocks if db.users == 0]
+    if unused:
+        bpy.data.batch_remove(unused)
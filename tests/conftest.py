@@ -0,0 +1,28 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ADDON_DIR = os.path.join(os.path.dirname(__file__), os.pardir)
+
+
+@pytest.fixture(scope="session")
+def lodify():
+    # The add-on registered in the bpy module, for the tests that need Blender
+    bpy = pytest.importorskip("bpy")
+    spec = importlib.util.spec_from_file_location("lodify", os.path.join(ADDON_DIR, "__init__.py"),
+                                                  submodule_search_locations=[ADDON_DIR])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["lodify"] = module
+    spec.loader.exec_module(module)
+    module.register()
+    yield module
+    module.unregister()
+
+
+@pytest.fixture
+def scene(lodify):
+    import bpy
+    bpy.ops.wm.read_homefile(use_empty=True)
+    return bpy.context.scene
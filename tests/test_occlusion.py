@@ -0,0 +1,49 @@
+# Tests of the hidden geometry removal, they need the bpy module and are skipped without it.
+
+import pytest
+
+
+def cube(bpy, name, size, collection):
+    import bmesh
+    mesh = bpy.data.meshes.new(name)
+    bm = bmesh.new()
+    bmesh.ops.create_cube(bm, size=size)
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.uv_layers.new()
+    material = bpy.data.materials.get("Material") or bpy.data.materials.new("Material")
+    material.use_nodes = True
+    mesh.materials.append(material)
+    obj = bpy.data.objects.new(name, mesh)
+    collection.objects.link(obj)
+    return obj
+
+
+@pytest.fixture
+def enclosed(scene):
+    # A cube fully inside a closed shell, like a cabin interior
+    import bpy
+    base = bpy.data.collections.new("Asset_LOD00")
+    scene.collection.children.link(base)
+    shell = cube(bpy, "Shell", 4.0, base)
+    interior = cube(bpy, "Interior", 1.0, base)
+    return shell, interior
+
+
+def test_enclosed_faces_are_hidden(lodify, enclosed):
+    shell, interior = enclosed
+    hidden = lodify.occlusion.find_hidden_faces([shell, interior], [shell.data, interior.data], 32, 32)
+    assert "Shell" not in hidden
+    assert sorted(hidden["Interior"].tolist()) == list(range(6))
+
+
+def test_generation_drops_enclosed_objects(lodify, scene, enclosed):
+    import bpy
+    scene.lod.cull_hidden = True
+    scene.lod.cull_min_lod = 2
+    assert bpy.ops.lodify.generate_lod_decimate() == {'FINISHED'}
+
+    assert "Interior_LOD01" in bpy.data.collections["Asset_LOD01"].objects
+    for level in (2, 3):
+        names = [obj.name for obj in bpy.data.collections[f"Asset_LOD{level:02d}"].objects]
+        assert names == [f"Shell_LOD{level:02d}"]
@@ -0,0 +1,159 @@
+# Tests of the quadric decimation kernel. quadric.py only needs NumPy, so it is loaded by path
+# without importing the add-on (and bpy).
+
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+spec = importlib.util.spec_from_file_location("quadric", os.path.join(os.path.dirname(__file__), os.pardir, "quadric.py"))
+quadric = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(quadric)
+
+
+def grid(size, noise=0.0, seed=0):
+    # Open quad grid in the XY plane with a little height noise, so every edge has a collapse cost
+    rng = np.random.default_rng(seed)
+    i, j = np.meshgrid(np.arange(size + 1), np.arange(size + 1), indexing='ij')
+    co = np.stack((i, j, noise * rng.standard_normal(i.shape)), axis=-1).reshape(-1, 3) / size
+    i, j = np.meshgrid(np.arange(size), np.arange(size), indexing='ij')
+    a = (i * (size + 1) + j).ravel()
+    loop_vert = np.stack((a, a + size + 1, a + size + 2, a + 1), axis=1).ravel()
+    quads = size * size
+    return {
+        "co": co.astype(np.float32),
+        "loop_vert": loop_vert.astype(np.int32),
+        "loop_start": np.arange(0, quads * 4, 4, dtype=np.int32),
+        "loop_total": np.full(quads, 4, dtype=np.int32),
+    }
+
+
+def triangles(result):
+    return result["loop_vert"].reshape(-1, 3)
+
+
+def normals(co, tri_vert):
+    p = co[tri_vert]
+    return np.cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0])
+
+
+def kept(result, points):
+    # Whether every point is still a vertex of the result
+    co = result["co"].astype(np.float64)
+    distances = np.linalg.norm(co[None, :, :] - np.asarray(points, dtype=np.float64)[:, None, :], axis=2)
+    return bool(np.all(distances.min(axis=1) < 1e-6))
+
+
+def test_empty_mesh():
+    arrays = {
+        "co": np.zeros((0, 3), dtype=np.float32),
+        "loop_vert": np.zeros(0, dtype=np.int32),
+        "loop_start": np.zeros(0, dtype=np.int32),
+        "loop_total": np.zeros(0, dtype=np.int32),
+    }
+    result = quadric.decimate(arrays, [], 0.5)
+    assert len(result["co"]) == 0
+    assert len(result["loop_vert"]) == 0
+    assert len(result["loop_start"]) == 0
+
+
+def test_single_triangle():
+    arrays = {
+        "co": np.eye(3, dtype=np.float32),
+        "loop_vert": np.arange(3, dtype=np.int32),
+        "loop_start": np.zeros(1, dtype=np.int32),
+        "loop_total": np.full(1, 3, dtype=np.int32),
+        "uv_0": np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]], dtype=np.float32),
+    }
+    result = quadric.decimate(arrays, [], 0.0)
+    assert np.array_equal(triangles(result), [[0, 1, 2]])
+    assert np.allclose(result["co"], arrays["co"])
+    assert np.allclose(result["uv_0"], arrays["uv_0"])
+
+
+def test_degenerate_polygons_are_dropped():
+    arrays = grid(4)
+    arrays["loop_vert"][:4] = arrays["loop_vert"][0]
+    result = quadric.decimate(arrays, [], 1.0)
+    assert len(triangles(result)) == (16 - 1) * 2
+
+
+def test_boundary_is_locked():
+    arrays = grid(16, noise=0.01)
+    co = arrays["co"]
+    boundary = (co[:, 0] == 0.0) | (co[:, 0] == 1.0) | (co[:, 1] == 0.0) | (co[:, 1] == 1.0)
+    result = quadric.decimate(arrays, [], 0.1)
+    assert len(triangles(result)) < len(arrays["loop_start"]) * 2
+    assert kept(result, co[boundary])
+
+
+def test_uv_seam_is_locked():
+    rings, segments = 32, 16
+    arrays = quadric.torus(rings, segments, noise=0.002)
+    seam = np.zeros((rings, segments), dtype=bool)
+    seam[0, :] = seam[:, 0] = True
+    result = quadric.decimate(arrays, ['POINT'], 0.1)
+    assert kept(result, arrays["co"][seam.ravel()])
+    uv = result["uv_0"]
+    assert uv.min() >= 0.0 and uv.max() <= 1.0
+
+
+@pytest.mark.parametrize("domain", ['POINT', 'CORNER'])
+def test_color_domains(domain):
+    arrays = quadric.torus(32, 16)
+    if domain == 'CORNER':
+        arrays["color_0"] = arrays["color_0"][arrays["loop_vert"]]
+    result = quadric.decimate(arrays, [domain], 0.25)
+    color = result["color_0"]
+    expected = len(result["co"]) if domain == 'POINT' else len(result["loop_vert"])
+    assert color.shape == (expected, 4)
+    # Colors are carried over from the kept vertices or corners, never interpolated
+    assert np.all((color[:, None, :] == arrays["color_0"][None, :, :]).all(axis=2).any(axis=1))
+
+
+def test_corner_color_discontinuity_is_locked():
+    arrays = grid(16, noise=0.01)
+    loop_vert = arrays["loop_vert"]
+    # Red and blue halves, split along x = 0.5 as a face-corner color seam
+    face_x = np.repeat(arrays["co"][loop_vert].reshape(-1, 4, 3)[:, :, 0].mean(axis=1), 4)
+    color = np.where((face_x < 0.5)[:, None], [1.0, 0.0, 0.0, 1.0], [0.0, 0.0, 1.0, 1.0]).astype(np.float32)
+    arrays["color_0"] = color
+    seam = np.abs(arrays["co"][:, 0] - 0.5) < 1e-6
+    result = quadric.decimate(arrays, ['CORNER'], 0.1)
+    assert kept(result, arrays["co"][seam])
+
+
+@pytest.mark.parametrize("ratio", [0.5, 0.1])
+def test_budget_and_valid_output(ratio):
+    arrays = quadric.torus(64, 32, noise=0.002)
+    count = len(arrays["loop_start"]) * 2
+    result = quadric.decimate(arrays, ['POINT'], ratio)
+    tri_vert = triangles(result)
+
+    # A collapse removes up to two triangles, so the budget can be undershot by one
+    assert np.ceil(count * ratio) - 1 <= len(tri_vert) <= np.ceil(count * ratio)
+    assert tri_vert.min() >= 0 and tri_vert.max() < len(result["co"])
+    assert len(result["uv_0"]) == len(result["loop_vert"])
+
+    # No degenerate triangles
+    assert not np.any((tri_vert[:, 0] == tri_vert[:, 1]) | (tri_vert[:, 1] == tri_vert[:, 2])
+                      | (tri_vert[:, 2] == tri_vert[:, 0]))
+    co = result["co"].astype(np.float64)
+    normal = normals(co, tri_vert)
+    assert np.all(np.linalg.norm(normal, axis=1) > 0.0)
+
+    # No flipped triangles: the normals point away from the tube, like the surface around their corners
+    corners = co[tri_vert]
+    ring = corners.copy()
+    ring[:, :, 2] = 0.0
+    ring /= np.linalg.norm(ring, axis=2, keepdims=True)
+    outward = corners - ring
+    outward = (outward / np.linalg.norm(outward, axis=2, keepdims=True)).sum(axis=1)
+    assert np.all((normal * outward).sum(axis=1) > 0.0)
+
+
+def test_max_error_stops_early():
+    arrays = quadric.torus(32, 16, noise=0.01)
+    result = quadric.decimate(arrays, ['POINT'], 0.0, max_error=0.0)
+    assert len(triangles(result)) == len(arrays["loop_start"]) * 2
@@ -0,0 +1,42 @@
+# Tests of the import of background worker results, they need the bpy module and are skipped without it.
+
+import pytest
+
+from test_occlusion import cube
+
+
+@pytest.fixture
+def parented(scene):
+    import bpy
+    base = bpy.data.collections.new("Asset_LOD00")
+    scene.collection.children.link(base)
+    body = cube(bpy, "Body", 2.0, base)
+    door = cube(bpy, "Door", 0.5, base)
+    door.parent = body
+    return body, door
+
+
+def test_worker_result_uses_local_parents_and_materials(lodify, scene, parented, tmp_path):
+    import bpy
+    source = str(tmp_path / "source.blend")
+    output = str(tmp_path / "output.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=source)
+
+    # What a worker does with its copy of the file
+    materials = set(bpy.data.materials.keys())
+    images = set(bpy.data.images.keys())
+    assert bpy.ops.lodify.generate_lod_decimate(asset_name="Asset") == {'FINISHED'}
+    bpy.ops.wm.save_as_mainfile(filepath=output, copy=True)
+    lodify.scheduler.write_lod_dependencies(bpy.context.scene.lod.assets["Asset"], output + ".json", materials, images)
+
+    bpy.ops.wm.open_mainfile(filepath=source)
+    scn = bpy.context.scene
+    lodify.scheduler.sync_assets(scn)
+    lodify.scheduler.import_worker_result(scn, scn.lod.assets["Asset"], output)
+
+    assert sorted(obj.name for obj in bpy.data.objects if not obj.name.endswith(("_LOD01", "_LOD02", "_LOD03"))) == ["Body", "Door"]
+    assert sorted(bpy.data.materials.keys()) == ["Material"]
+    door = bpy.data.collections["Asset_LOD01"].objects["Door_LOD01"]
+    assert door.parent == bpy.data.objects["Body"]
+    assert door.material_slots[0].material == bpy.data.materials["Material"]
+    assert [item.ui_lod.name for item in scn.lod.assets["Asset"].lod_list] == [f"Asset_LOD{i:02d}" for i in range(4)]
@@ -1,6 +1,7 @@
 # ui.py
 
 import bpy
+from . import budget
 
 class LODIFY_UL_items(bpy.types.UIList):
     def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
@@ -20,6 +21,32 @@ class LODIFY_UL_items(bpy.types.UIList):
         if context.scene.lod.p_rdf_switch:
             sub.prop(item, "ui_rdf", text='', icon='RESTRICT_RENDER_OFF' if item.ui_rdf else 'RESTRICT_RENDER_ON')
 
+        if context.scene.lod.preview_enabled:
+            sub = row.row(align=True)
+            sub.scale_x = 0.8
+            sub.prop(item, "ui_min_size", text='')
+
+class LODIFY_UL_assets(bpy.types.UIList):
+    STATUS_ICONS = {
+        'IDLE': 'BLANK1',
+        'QUEUED': 'SORTTIME',
+        'RUNNING': 'PLAY',
+        'DONE': 'CHECKMARK',
+        'FAILED': 'ERROR',
+    }
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.label(text=item.name, icon='OUTLINER_COLLECTION')
+
+        sub = row.row(align=True)
+        sub.alignment = 'RIGHT'
+        if item.status == 'RUNNING' and item.progress:
+            sub.label(text=f"{item.progress:.0f}%")
+        if item.duration:
+            sub.label(text=f"{item.duration:.1f}s")
+        sub.label(text='', icon=self.STATUS_ICONS[item.status])
+
 class LODIFY_PT_collectionList(bpy.types.Panel):
     bl_label = "Level of Detail Collections"
     bl_idname = "LODIFY_PT_collectionList"
@@ -40,44 +67,138 @@ class LODIFY_PT_collectionList(bpy.types.Panel):
         main.enabled = scn.lod.lod_enabled
 
         row = main.row()
-        col1 = row.column()
-        col2 = row.column()
-
-        template = col1.column()
-        template.template_list("LODIFY_UL_items", "", scn.lod, "lod_list", scn.lod, "lod_list_index", rows=2)
+        row.template_list("LODIFY_UL_assets", "", scn.lod, "assets", scn.lod, "assets_index", rows=2)
+        row.operator("lodify.auto_setup", text="", icon='FILE_REFRESH')
 
-        col2.separator(factor=1.0)
-        add = col2.column(align=True)
-        add.operator("lodify.list_action", icon='ADD', text="").action = 'ADD'
-        rem = col2.column(align=True)
-        rem.enabled = bool(len(scn.lod.lod_list))
-        rem.operator("lodify.list_action", icon='REMOVE', text="").action = 'REMOVE'
+        asset = scn.lod.active_asset()
+        if asset:
+            row = main.row()
+            col1 = row.column()
+            col2 = row.column()
+
+            template = col1.column()
+            template.template_list("LODIFY_UL_items", "", asset, "lod_list", asset, "lod_list_index", rows=2)
+
+            col2.separator(factor=1.0)
+            add = col2.column(align=True)
+            add.operator("lodify.list_action", icon='ADD', text="").action = 'ADD'
+            rem = col2.column(align=True)
+            rem.enabled = bool(len(asset.lod_list))
+            rem.operator("lodify.list_action", icon='REMOVE', text="").action = 'REMOVE'
+
+        row = main.row(align=True)
+        row.prop(scn.lod, "p_rdv_switch", text="Rendered View", toggle=True)
+        row.prop(scn.lod, "p_rdf_switch", text="Final Render", toggle=True)
+        row = main.row(align=True)
+        row.prop(scn.lod, "preview_enabled", toggle=True)
+        sub = row.row(align=True)
+        sub.enabled = scn.lod.preview_enabled
+        sub.prop(scn.lod, "preview_interval", text="Interval")
 
         main.separator()
         main.prop(scn.lod, "small_object_threshold")
         
         main.separator()
-        main.prop(scn.lod, "decimate_angle_increment")
+        main.prop(scn.lod, "decimate_engine")
+        if scn.lod.decimate_engine == 'QUADRIC':
+            col = main.column(align=True)
+            col.prop(scn.lod, "quadric_ratio")
+            col.prop(scn.lod, "quadric_workers")
+        else:
+            main.prop(scn.lod, "decimate_angle_increment")
+        row = main.row(align=True)
+        row.prop(scn.lod, "cleanup_enabled")
+        sub = row.row(align=True)
+        sub.enabled = scn.lod.cleanup_enabled
+        sub.prop(scn.lod, "cleanup_merge_distance")
         
         
+        main.prop(scn.lod, "cull_hidden")
+        if scn.lod.cull_hidden:
+            col = main.column(align=True)
+            col.prop(scn.lod, "cull_min_lod")
+            col.prop(scn.lod, "cull_samples")
+            col.prop(scn.lod, "cull_resolution")
+
         main.separator()
-        main.operator("lodify.generate_lod_decimate", text="Generate LODs (Decimate)")
+        main.prop(scn.lod, "streaming_enabled")
+        if scn.lod.streaming_enabled:
+            col = main.column(align=True)
+            col.prop(scn.lod, "stream_chunk_size")
+            col.prop(scn.lod, "stream_memory_limit")
+
+        row = main.row(align=True)
+        row.prop(scn.lod, "cache_enabled")
+        row.operator("lodify.clear_mesh_cache", text="", icon='TRASH')
+        if scn.lod.cache_enabled:
+            col = main.column(align=True)
+            col.prop(scn.lod, "cache_path")
+            col.prop(scn.lod, "cache_size_limit")
+
+        main.separator()
+        row = main.row(align=True)
+        row.prop(scn.lod, "use_background_workers")
+        sub = row.row(align=True)
+        sub.enabled = scn.lod.use_background_workers
+        sub.prop(scn.lod, "max_workers", text="Workers")
+        if scn.lod.use_background_workers:
+            main.operator("lodify.generate_lod_queue", text="Generate LODs (Decimate)")
+        else:
+            main.prop(scn.lod, "undo_light")
+            if scn.lod.undo_light:
+                row = main.row(align=True)
+                row.operator("lodify.generate_lod_decimate_light", text="Generate LODs (Decimate)")
+                row.operator("lodify.revert_last_generation", text="", icon='LOOP_BACK')
+            else:
+                main.operator("lodify.generate_lod_decimate", text="Generate LODs (Decimate)")
+        if asset:
+            operator = "lodify.generate_lod_decimate_light" if scn.lod.undo_light else "lodify.generate_lod_decimate"
+            main.operator(operator, text=f"Generate {asset.name} Only").asset_name = asset.name
         
         main.separator()
         main.label(text="Material Conversion:")
         main.prop(scn.lod, "texture_path", text="Texture Path")
         row = main.row()
         row.operator("lodify.convert_msfs_to_blender", text="MSFS to Blender")
-        row.operator("lodify.convert_blender_to_msfs", text="Convert All to MSFS")
+        row.operator("lodify.convert_blender_to_msfs", text="Convert LODs to MSFS")
 
         main.separator()
         main.label(text="Texture Baking:")
         main.operator("lodify.bake_to_vertex_colors", text="Bake Textures to Vertex Colors")
+        main.prop(scn.lod, "bake_normals")
+        col = main.column(align=True)
+        col.prop(scn.lod, "bake_normal_size")
+        col.prop(scn.lod, "bake_cage_extrusion")
+        col.prop(scn.lod, "bake_max_ray_distance")
+        main.operator("lodify.bake_lod_normals", text="Bake LOD Normal Maps")
+
+        main.separator()
+        main.label(text="Performance Budget:")
+        col = main.column(align=True)
+        col.prop(scn.lod, "budget_triangle_ratio")
+        col.prop(scn.lod, "budget_max_draw_calls")
+        col.prop(scn.lod, "budget_max_texture_mb")
+        main.operator("lodify.analyze_lod_budget", text="Analyze LOD Budget")
+        report = budget.load_report(scn)
+        if report:
+            # Only the report of the active asset is shown
+            asset_report = next((entry for entry in report.get("assets", ()) if asset and entry["name"] == asset.name), None)
+            if asset_report:
+                box = main.box()
+                for lod in asset_report["lods"]:
+                    col = box.column(align=True)
+                    col.alert = bool(lod.get("violations"))
+                    col.label(text=lod["name"], icon='ERROR' if col.alert else 'CHECKMARK')
+                    col.label(text=f"{lod['triangles']:,} tris, {lod['vertices']:,} verts, {lod['objects']} objects")
+                    col.label(text=f"{lod['draw_calls']} draw calls, {lod['materials']} materials")
+                    col.label(text=f"Textures {lod['texture_bytes'] / 1048576:.1f} MB, colors {lod['color_bytes'] / 1048576:.1f} MB")
+                    for message in lod.get("violations", ()):
+                        col.label(text=message)
 
         # Add buttons to apply modifiers for each LOD
         main.separator()
         main.label(text="Apply Modifiers (All Collection Objects):")
-        for i, item in enumerate(scn.lod.lod_list):
+        for i, item in enumerate(asset.lod_list if asset else ()):
             row = main.row()
             row.operator("lodify.apply_lod_modifiers", text=f"Apply LOD{i:02d} Modifiers").lod_index = i
         
@@ -87,6 +208,7 @@ class LODIFY_PT_collectionList(bpy.types.Panel):
 
 classes = (
     LODIFY_UL_items,
+    LODIFY_UL_assets,
     LODIFY_PT_collectionList,
 )
 
@@ -94,18 +216,9 @@ def register():
     for cls in classes:
         bpy.utils.register_class(cls)
 
-    bpy.types.Scene.lod.texture_path = bpy.props.StringProperty(
-        name="Texture Path",
-        description="Path to the folder containing textures",
-        default="",
-        subtype='DIR_PATH'
-    )
-
 def unregister():
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
 
-    del bpy.types.Scene.lod.texture_path
-
 if __name__ == "__main__":
     register()
\ No newline at end of file